@@ -36,16 +36,48 @@ def create_app(config_name=None):
     db.init_app(app)
     CORS(app, origins=['*'])  # Allow all origins for development
     
+    # Invalidate cached read responses on every committed write
+    from app.services.response_cache import response_cache
+    response_cache.init_app(app, db)
+    
+    # Log camera and gate changes for delta status sync
+    from app.services.status_sync import status_sync
+    status_sync.init_app()
+    
     # Register blueprints
     from app.routes.camera import camera_bp
     from app.routes.vehicle import vehicle_bp
     from app.routes.gate import gate_bp
     from app.routes.dashboard import dashboard_bp
+    from app.routes.access import access_bp
+    from app.routes.events import events_bp
     
     app.register_blueprint(camera_bp, url_prefix='/api/camera')
     app.register_blueprint(vehicle_bp, url_prefix='/api/vehicle')
     app.register_blueprint(gate_bp, url_prefix='/api/gate')
     app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    app.register_blueprint(access_bp, url_prefix='/api/access')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
+    # Background workers start with the first request so that the
+    # reloader's watcher process never runs them
+    from app.services.heartbeat_service import heartbeat_scheduler
+    from app.services.anpr_listener import anpr_listener
+    from app.services.ingest_service import ingest_service
+    from app.services.gate_dispatcher import gate_dispatcher
+    from app.services.access_log_writer import access_log_writer
+    
+    @app.before_request
+    def start_background_workers():
+        heartbeat_scheduler.start(app)
+        access_log_writer.start(app)
+        gate_dispatcher.start(app)
+        ingest_service.start(app)
+        anpr_listener.start(app)
     
     # Health check endpoint
     @app.route('/api/health')
@@ -61,6 +93,19 @@ def create_app(config_name=None):
         try:
             db.create_all()
             print("✅ Database tables created successfully")
+            
+            # Add columns and indexes introduced after the tables were created
+            from app.utils.migrations import upgrade_schema
+            for change in upgrade_schema(db):
+                print(f"✅ Schema upgraded: {change}")
+            
+            # Warm the in-memory plate authorization index
+            from app.services.plate_index import plate_index
+            plate_index.load()
+            
+            from app.services.access_rollups import access_rollups
+            if access_rollups.needs_backfill():
+                print("⚠️  Access rollups are empty: run `flask backfill-rollups` to chart existing access logs")
         except Exception as e:
             print(f"❌ Database connection error: {e}")
     
@@ -0,0 +1,94 @@
+"""
+CLI Commands
+Maintenance commands registered on the Flask app (run with `flask <command>`)
+"""
+
+import sys
+from datetime import datetime, timedelta
+import click
+from sqlalchemy import func, select, text
+from app import db
+from app.models.access_log import AccessLog
+from app.services.access_rollups import access_rollups
+
+def dashboard_query_shapes():
+    """The access_logs queries behind routes/dashboard.py, by name"""
+    yesterday = datetime.utcnow() - timedelta(hours=24)
+    week_ago = datetime.utcnow() - timedelta(days=7)
+
+    return {
+        'overview entries (24h)': select(func.count()).select_from(AccessLog).where(
+            AccessLog.timestamp >= yesterday, AccessLog.event_type == 'entry'
+        ),
+        'overview exits (24h)': select(func.count()).select_from(AccessLog).where(
+            AccessLog.timestamp >= yesterday, AccessLog.event_type == 'exit'
+        ),
+        'manual overrides (24h / 1h alert)': select(func.count()).select_from(AccessLog).where(
+            AccessLog.timestamp >= yesterday, AccessLog.access_method == 'manual'
+        ),
+        'recent activity': select(AccessLog).order_by(AccessLog.timestamp.desc()).limit(20),
+        'access stats (edge hour)': select(AccessLog.event_type, func.count(AccessLog.id)).where(
+            AccessLog.timestamp >= week_ago, AccessLog.timestamp < week_ago + timedelta(hours=1)
+        ).group_by(AccessLog.event_type),
+        'plate history': select(AccessLog).where(
+            AccessLog.license_plate == 'ABC1234'
+        ).order_by(AccessLog.timestamp.desc()).limit(20)
+    }
+
+def explain(statement):
+    """Get the database's query plan for a statement as text lines"""
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN' if dialect.name == 'sqlite' else 'EXPLAIN'
+
+    rows = db.session.execute(text(f'{prefix} {sql}')).all()
+    if dialect.name == 'sqlite':
+        return [row[-1] for row in rows]
+    if dialect.name == 'mysql':
+        return [f"{row._mapping['table']} type={row._mapping['type']} key={row._mapping['key']}"
+                for row in rows]
+    return [str(row[0]) for row in rows]
+
+def is_full_scan(plan, table='access_logs'):
+    """True if a plan reads the whole table instead of an index"""
+    for line in plan:
+        if line.startswith(f'SCAN {table}') and 'INDEX' not in line:
+            return True   # SQLite
+        if f'Seq Scan on {table}' in line:
+            return True   # PostgreSQL
+        if line.startswith(f'{table} type=ALL'):
+            return True   # MySQL
+    return False
+
+def register_commands(app):
+    """Register the CLI commands on the app"""
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans():
+        """Fail if a dashboard query on access_logs needs a full table scan
+
+        PostgreSQL and MySQL may still pick a scan for a small table, so
+        run this against a database with realistic data.
+        """
+        failed = []
+        for name, statement in dashboard_query_shapes().items():
+            plan = explain(statement)
+            full_scan = is_full_scan(plan)
+            click.echo(f"{'❌' if full_scan else '✅'} {name}")
+            for line in plan:
+                click.echo(f'    {line}')
+            if full_scan:
+                failed.append(name)
+
+        if failed:
+            click.echo(f"❌ Full table scans: {', '.join(failed)}")
+            sys.exit(1)
+        click.echo('✅ All dashboard queries use an index')
+
+    @app.cli.command('backfill-rollups')
+    @click.option('--days', type=int, default=None, help='Only rebuild the last N days')
+    def backfill_rollups(days):
+        """Rebuild the hourly access rollups from access_logs"""
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        buckets, rows = access_rollups.backfill(since)
+        click.echo(f'✅ Rolled up {rows} access logs into {buckets} hourly buckets')
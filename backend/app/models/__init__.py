@@ -7,6 +7,7 @@ from .vehicle import Vehicle
 from .camera import Camera
 from .gate import Gate
 from .access_log import AccessLog
+from .access_rollup import AccessRollup
 
-__all__ = ['Vehicle', 'Camera', 'Gate', 'AccessLog']
+__all__ = ['Vehicle', 'Camera', 'Gate', 'AccessLog', 'AccessRollup']
 
@@ -8,11 +8,20 @@ from datetime import datetime
 
 class AccessLog(db.Model):
     __tablename__ = 'access_logs'
+    __table_args__ = (
+        # Dashboard query shapes: 24h counts per event type / access method,
+        # recent activity ordered by time, per-plate history
+        db.Index('ix_access_logs_timestamp', 'timestamp'),
+        db.Index('ix_access_logs_event_type_timestamp', 'event_type', 'timestamp'),
+        db.Index('ix_access_logs_access_method_timestamp', 'access_method', 'timestamp'),
+        db.Index('ix_access_logs_license_plate_timestamp', 'license_plate', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=True)
-    camera_id = db.Column(db.Integer, db.ForeignKey('cameras.id'), nullable=True)
-    gate_id = db.Column(db.Integer, db.ForeignKey('gates.id'), nullable=True)
+    event_id = db.Column(db.String(32), unique=True, index=True)  # idempotent journal replay
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=True, index=True)
+    camera_id = db.Column(db.Integer, db.ForeignKey('cameras.id'), nullable=True, index=True)
+    gate_id = db.Column(db.Integer, db.ForeignKey('gates.id'), nullable=True, index=True)
     
     # Event details
     license_plate = db.Column(db.String(20), nullable=False)
@@ -34,6 +43,7 @@ class AccessLog(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'event_id': self.event_id,
             'vehicle_id': self.vehicle_id,
             'camera_id': self.camera_id,
             'gate_id': self.gate_id,
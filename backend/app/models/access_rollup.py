@@ -0,0 +1,31 @@
+"""
+Access Rollup Model
+Hourly access counts by gate, event type and access method
+"""
+
+from app import db
+
+class AccessRollup(db.Model):
+    __tablename__ = 'access_rollups'
+    __table_args__ = (
+        db.Index('ix_access_rollups_hour_bucket', 'hour', 'gate_id', 'event_type', 'access_method'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)  # start of the hour (UTC)
+    gate_id = db.Column(db.Integer, db.ForeignKey('gates.id'), nullable=True)
+    event_type = db.Column(db.String(20), nullable=False)
+    access_method = db.Column(db.String(20))
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'hour': self.hour.isoformat(),
+            'gate_id': self.gate_id,
+            'event_type': self.event_type,
+            'access_method': self.access_method,
+            'count': self.count
+        }
+    
+    def __repr__(self):
+        return f'<AccessRollup {self.hour} {self.event_type} x{self.count}>'
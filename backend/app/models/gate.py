@@ -55,8 +55,8 @@ class Gate(db.Model):
         }
     
     def get_control_url(self, action='open'):
-        """Generate control URL for gate operation"""
-        if not self.controller_ip:
+        """Generate control URL for gate operation (HTTP controllers only)"""
+        if not self.controller_ip or (self.control_method or 'http') != 'http':
             return None
         
         if action == 'open' and self.open_command:
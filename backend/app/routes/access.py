@@ -0,0 +1,107 @@
+"""
+Access API Routes
+Handle pushed ANPR events, ingestion and pipeline latency monitoring
+"""
+
+from flask import Blueprint, request, jsonify
+from app.services.event_journal import event_journal
+from app.services.ingest_service import ingest_service
+from app.services.pipeline_metrics import pipeline_metrics
+
+access_bp = Blueprint('access', __name__)
+
+@access_bp.route('/events', methods=['POST'])
+def ingest_events():
+    """Accept one ANPR event or a batch of them for asynchronous processing"""
+    try:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict) and 'events' in data:
+            data = data['events']
+        if isinstance(data, dict):
+            data = [data]
+
+        if not isinstance(data, list) or not data:
+            return jsonify({
+                'success': False,
+                'error': 'Expected an event object or a non-empty list of events'
+            }), 400
+
+        result = ingest_service.ingest(data)
+
+        if not result['accepted'] and ingest_service.queue.full():
+            return jsonify({**result, 'error': 'Ingest queue is full'}), 503
+
+        return jsonify(result), 202
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to ingest events: {str(e)}'
+        }), 500
+
+@access_bp.route('/ingest', methods=['GET'])
+def get_ingest_stats():
+    """Get ingest queue depth, counters and lag"""
+    try:
+        return jsonify({
+            'success': True,
+            'ingest': ingest_service.get_stats()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to get ingest stats: {str(e)}'
+        }), 500
+
+@access_bp.route('/latency', methods=['GET'])
+def get_pipeline_latency():
+    """Get plate-seen to barrier-open latency percentiles per gate"""
+    try:
+        gate_id = request.args.get('gate_id', type=int)
+        return jsonify({
+            'success': True,
+            'latency': pipeline_metrics.get_stats(gate_id)
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to get pipeline latency: {str(e)}'
+        }), 500
+
+@access_bp.route('/journal', methods=['GET'])
+def get_journal_stats():
+    """Get the local access event journal state"""
+    try:
+        return jsonify({
+            'success': True,
+            'journal': event_journal.get_stats()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to get journal stats: {str(e)}'
+        }), 500
+
+@access_bp.route('/journal/replay', methods=['POST'])
+def replay_journal():
+    """Ask the writer to apply journaled events missing from the database"""
+    try:
+        if not event_journal.request_replay():
+            return jsonify({
+                'success': False,
+                'error': 'Access journal is disabled'
+            }), 409
+        
+        return jsonify({
+            'success': True,
+            'message': 'Journal replay requested'
+        }), 202
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to request journal replay: {str(e)}'
+        }), 500
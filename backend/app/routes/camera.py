@@ -3,10 +3,15 @@ Camera API Routes - MVP Version
 Handle camera-related API endpoints
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from app import db
 from app.models.camera import Camera
 from app.services.camera_service import camera_service
+from app.services.plate_index import plate_index
+from app.services.anpr_listener import anpr_listener
+from app.services.snapshot_cache import snapshot_cache
+from app.services.snapshot_variants import snapshot_variants, check_params
+from app.services.response_cache import response_cache
 
 camera_bp = Blueprint('camera', __name__)
 
@@ -69,6 +74,7 @@ def add_camera():
         
         db.session.add(camera)
         db.session.commit()
+        plate_index.set_camera(camera)
         
         return jsonify({
             'success': True,
@@ -139,6 +145,120 @@ def get_snapshot(camera_id):
             'error': str(e)
         }), 500
 
+@camera_bp.route('/<int:camera_id>/snapshot.jpg', methods=['GET'])
+def get_snapshot_image(camera_id):
+    """Get camera snapshot as raw image bytes (supports ETag/Last-Modified)
+    
+    Optional ?w=, ?h=, ?format=jpeg|webp|png and ?quality= return a resized
+    or transcoded variant, e.g. small tiles for the dashboard grid.
+    """
+    try:
+        width = request.args.get('w', type=int)
+        height = request.args.get('h', type=int)
+        fmt = request.args.get('format')
+        quality = request.args.get('quality', 75, type=int)
+        
+        error = check_params(width, height, fmt, quality)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        result = camera_service.fetch_snapshot(camera_id)
+        
+        if not result['success']:
+            return jsonify(result), 400
+        
+        if width is not None or height is not None or fmt:
+            result = snapshot_variants.get_variant(
+                camera_id, result, width, height, fmt or 'jpeg', quality
+            )
+        
+        response = Response(result['content'], mimetype=result['content_type'])
+        response.set_etag(result['etag'])
+        response.last_modified = result['timestamp']
+        response.cache_control.no_cache = True
+        
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@camera_bp.route('/snapshot-cache', methods=['GET'])
+def get_snapshot_cache_stats():
+    """Get snapshot cache statistics"""
+    try:
+        return jsonify({
+            'success': True,
+            'cache': snapshot_cache.get_stats(),
+            'variants': snapshot_variants.get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@camera_bp.route('/<int:camera_id>/live.mjpg', methods=['GET'])
+def get_live_stream(camera_id):
+    """Stream live MJPEG from the camera's shared RTSP decoder"""
+    try:
+        fps = min(max(request.args.get('fps', 5, type=float), 0.2), 25)
+        
+        grabber = camera_service.acquire_stream(camera_id)
+        if not grabber:
+            return jsonify({
+                'success': False,
+                'error': 'Camera not found'
+            }), 404
+        
+        response = Response(
+            camera_service.generate_mjpeg(grabber, fps),
+            mimetype='multipart/x-mixed-replace; boundary=frame'
+        )
+        response.cache_control.no_cache = True
+        response.cache_control.no_store = True
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@camera_bp.route('/streams', methods=['GET'])
+def get_streams_status():
+    """Get status of shared RTSP decoders"""
+    try:
+        result = camera_service.get_streams_status()
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@camera_bp.route('/anpr-listeners', methods=['GET'])
+def get_anpr_listeners():
+    """Get status of ISAPI alertStream listeners"""
+    try:
+        return jsonify({
+            'success': True,
+            'anpr': anpr_listener.get_status()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @camera_bp.route('/<int:camera_id>/stream', methods=['GET'])
 def get_stream_info(camera_id):
     """Get camera stream information"""
@@ -167,6 +287,7 @@ def get_stream_info(camera_id):
         }), 500
 
 @camera_bp.route('/status', methods=['GET'])
+@response_cache.cached('cameras')
 def get_all_status():
     """Get status of all cameras"""
     try:
@@ -207,6 +328,8 @@ def update_camera(camera_id):
             camera.confidence_threshold = data['confidence_threshold']
         
         db.session.commit()
+        snapshot_cache.invalidate(camera_id)
+        plate_index.set_camera(camera)
         
         return jsonify({
             'success': True,
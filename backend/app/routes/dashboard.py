@@ -5,76 +5,51 @@ Handle dashboard and monitoring API endpoints
 
 from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
-from sqlalchemy import func
-from app import db
 from app.models.vehicle import Vehicle
 from app.models.camera import Camera
 from app.models.gate import Gate
 from app.models.access_log import AccessLog
+from app.services.access_rollups import access_rollups
+from app.services.camera_service import camera_service
+from app.services.dashboard_stats import dashboard_stats
+from app.services.device_http import device_http
+from app.services.gate_service import gate_service
+from app.services.health_service import health_service
+from app.services.heartbeat_service import heartbeat_scheduler
+from app.services.response_cache import response_cache
+from app.services.status_sync import status_sync
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/overview', methods=['GET'])
+@response_cache.cached('vehicles', 'cameras', 'gates', 'access_logs')
 def get_overview():
     """Get dashboard overview statistics"""
     try:
-        # Vehicle statistics
-        total_vehicles = Vehicle.query.count()
-        permanent_vehicles = Vehicle.query.filter_by(is_permanent=True).count()
-        temporary_vehicles = Vehicle.query.filter_by(is_permanent=False).count()
-        active_vehicles = Vehicle.query.filter_by(status='active').count()
-        
-        # Camera statistics
-        total_cameras = Camera.query.count()
-        online_cameras = Camera.query.filter_by(status='online').count()
-        offline_cameras = Camera.query.filter_by(status='offline').count()
-        
-        # Gate statistics
-        total_gates = Gate.query.count()
-        online_gates = Gate.query.filter_by(is_online=True).count()
-        open_gates = Gate.query.filter_by(status='open').count()
+        # One grouped query per table
+        vehicles = dashboard_stats.vehicle_counts()
+        cameras = dashboard_stats.camera_counts()
+        gates = dashboard_stats.gate_counts()
         
         # Access log statistics (last 24 hours)
         yesterday = datetime.utcnow() - timedelta(hours=24)
-        recent_entries = AccessLog.query.filter(
-            AccessLog.timestamp >= yesterday,
-            AccessLog.event_type == 'entry'
-        ).count()
-        
-        recent_exits = AccessLog.query.filter(
-            AccessLog.timestamp >= yesterday,
-            AccessLog.event_type == 'exit'
-        ).count()
-        
-        manual_overrides = AccessLog.query.filter(
-            AccessLog.timestamp >= yesterday,
-            AccessLog.access_method == 'manual'
-        ).count()
+        access_logs = dashboard_stats.access_counts(yesterday)
         
         return jsonify({
             'success': True,
             'overview': {
-                'vehicles': {
-                    'total': total_vehicles,
-                    'permanent': permanent_vehicles,
-                    'temporary': temporary_vehicles,
-                    'active': active_vehicles
-                },
+                'vehicles': vehicles,
                 'cameras': {
-                    'total': total_cameras,
-                    'online': online_cameras,
-                    'offline': offline_cameras
+                    'total': cameras['total'],
+                    'online': cameras['online'],
+                    'offline': cameras['offline']
                 },
                 'gates': {
-                    'total': total_gates,
-                    'online': online_gates,
-                    'open': open_gates
+                    'total': gates['total'],
+                    'online': gates['online'],
+                    'open': gates['open']
                 },
-                'access_logs_24h': {
-                    'entries': recent_entries,
-                    'exits': recent_exits,
-                    'manual_overrides': manual_overrides
-                }
+                'access_logs_24h': access_logs
             }
         })
         
@@ -85,6 +60,7 @@ def get_overview():
         }), 500
 
 @dashboard_bp.route('/recent-activity', methods=['GET'])
+@response_cache.cached('access_logs')
 def get_recent_activity():
     """Get recent access activity"""
     try:
@@ -107,24 +83,19 @@ def get_recent_activity():
         }), 500
 
 @dashboard_bp.route('/system-status', methods=['GET'])
+@response_cache.cached('cameras', 'gates')
 def get_system_status():
     """Get overall system health status"""
     try:
         # Check camera status
-        cameras = Camera.query.all()
-        camera_health = {
-            'total': len(cameras),
-            'online': sum(1 for c in cameras if c.status == 'online'),
-            'offline': sum(1 for c in cameras if c.status == 'offline'),
-            'error': sum(1 for c in cameras if c.status == 'error')
-        }
+        camera_health = dashboard_stats.camera_counts()
         
         # Check gate status
-        gates = Gate.query.all()
+        gates = dashboard_stats.gate_counts()
         gate_health = {
-            'total': len(gates),
-            'online': sum(1 for g in gates if g.is_online),
-            'offline': sum(1 for g in gates if not g.is_online)
+            'total': gates['total'],
+            'online': gates['online'],
+            'offline': gates['offline']
         }
         
         # Determine overall system health
@@ -158,44 +129,15 @@ def get_system_status():
         }), 500
 
 @dashboard_bp.route('/access-stats', methods=['GET'])
+@response_cache.cached('access_rollups', 'access_logs')
 def get_access_stats():
     """Get access statistics for charts"""
     try:
         days = request.args.get('days', 7, type=int)
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Daily access counts
-        daily_stats = db.session.query(
-            func.date(AccessLog.timestamp).label('date'),
-            func.count(AccessLog.id).label('count'),
-            AccessLog.event_type
-        ).filter(
-            AccessLog.timestamp >= start_date
-        ).group_by(
-            func.date(AccessLog.timestamp),
-            AccessLog.event_type
-        ).all()
-        
-        # Process data for chart
-        chart_data = {}
-        for stat in daily_stats:
-            date_str = stat.date.strftime('%Y-%m-%d')
-            if date_str not in chart_data:
-                chart_data[date_str] = {'entries': 0, 'exits': 0}
-            
-            if stat.event_type == 'entry':
-                chart_data[date_str]['entries'] = stat.count
-            elif stat.event_type == 'exit':
-                chart_data[date_str]['exits'] = stat.count
-        
-        # Convert to list format for frontend
-        chart_list = []
-        for date_str, counts in sorted(chart_data.items()):
-            chart_list.append({
-                'date': date_str,
-                'entries': counts['entries'],
-                'exits': counts['exits']
-            })
+        # Daily access counts from the hourly rollups
+        chart_list = access_rollups.daily_counts(start_date)
         
         return jsonify({
             'success': True,
@@ -209,7 +151,48 @@ def get_access_stats():
             'error': str(e)
         }), 500
 
+@dashboard_bp.route('/sync', methods=['GET'])
+def sync_status():
+    """Get cameras and gates changed since a version (?since=)
+    
+    Without since, or with one the server no longer remembers, every
+    camera and gate is returned with full=true. Otherwise only changed
+    devices come back, and deleted ones are listed by id.
+    """
+    try:
+        since = request.args.get('since', type=int)
+        version, changed = status_sync.changes_since(since)
+        
+        if changed is None:
+            cameras = Camera.query.all()
+            gates = Gate.query.all()
+        else:
+            cameras = Camera.query.filter(Camera.id.in_(changed['camera'])).all() if changed['camera'] else []
+            gates = Gate.query.filter(Gate.id.in_(changed['gate'])).all() if changed['gate'] else []
+        
+        found_cameras = {camera.id for camera in cameras}
+        found_gates = {gate.id for gate in gates}
+        
+        return jsonify({
+            'success': True,
+            'version': version,
+            'full': changed is None,
+            'cameras': [camera_service.status_dict(camera) for camera in cameras],
+            'gates': [gate_service.status_dict(gate) for gate in gates],
+            'deleted': {
+                'cameras': [i for i in (changed or {}).get('camera', []) if i not in found_cameras],
+                'gates': [i for i in (changed or {}).get('gate', []) if i not in found_gates]
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @dashboard_bp.route('/alerts', methods=['GET'])
+@response_cache.cached('cameras', 'gates', 'vehicles', 'access_logs')
 def get_alerts():
     """Get system alerts and warnings"""
     try:
@@ -252,10 +235,7 @@ def get_alerts():
         
         # Check for excessive manual overrides (last hour)
         one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        manual_count = AccessLog.query.filter(
-            AccessLog.timestamp >= one_hour_ago,
-            AccessLog.access_method == 'manual'
-        ).count()
+        manual_count = dashboard_stats.access_counts(one_hour_ago)['manual_overrides']
         
         if manual_count > 10:
             alerts.append({
@@ -277,3 +257,102 @@ def get_alerts():
             'error': str(e)
         }), 500
 
+@dashboard_bp.route('/health-check', methods=['POST'])
+def run_health_check():
+    """Probe all cameras and gates concurrently"""
+    try:
+        result = health_service.check_fleet()
+        
+        if result['success']:
+            return jsonify(result)
+        else:
+            return jsonify(result), 500
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@dashboard_bp.route('/heartbeat', methods=['GET'])
+def get_heartbeat_status():
+    """Get background heartbeat scheduler status"""
+    try:
+        return jsonify({
+            'success': True,
+            'heartbeat': heartbeat_scheduler.get_status()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@dashboard_bp.route('/connections', methods=['GET'])
+def get_connection_stats():
+    """Get pooled device connection statistics"""
+    try:
+        return jsonify({
+            'success': True,
+            'connections': device_http.get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@dashboard_bp.route('/breakers', methods=['GET'])
+def get_circuit_breakers():
+    """Get the circuit breaker state of every device host"""
+    try:
+        breakers = device_http.get_breakers()
+        return jsonify({
+            'success': True,
+            'breakers': breakers,
+            'open': sum(1 for breaker in breakers if breaker['state'] != 'closed')
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@dashboard_bp.route('/breakers/<host>/reset', methods=['POST'])
+def reset_circuit_breaker(host):
+    """Close a device's circuit breaker by hand"""
+    try:
+        if not device_http.reset_breaker(host):
+            return jsonify({
+                'success': False,
+                'error': 'Unknown device host'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'message': f'Circuit breaker for {host} reset'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@dashboard_bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """Get response cache hit counters"""
+    try:
+        return jsonify({
+            'success': True,
+            'cache': response_cache.get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
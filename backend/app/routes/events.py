@@ -0,0 +1,88 @@
+"""
+Events API Routes
+Server-Sent Events stream of gate, camera, access and command updates
+"""
+
+import json
+from flask import Blueprint, Response, request, jsonify
+from app.services.event_bus import TOPICS, event_bus
+
+events_bp = Blueprint('events', __name__)
+
+def _format(event_id, name, data):
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(data)}\n\n'
+
+@events_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """Stream live updates; ?topics=gate,camera,access,command (default all)
+
+    Reconnecting clients send Last-Event-ID (EventSource does this itself)
+    or ?last_event_id= and receive the events they missed.
+    """
+    try:
+        topics = [t for t in request.args.get('topics', ','.join(TOPICS)).split(',') if t]
+        unknown = [t for t in topics if t not in TOPICS]
+        if unknown or not topics:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown topics: {', '.join(unknown)}" if unknown else 'No topics given',
+                'topics': list(TOPICS)
+            }), 400
+
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+
+        subscription, missed, resync_id = event_bus.subscribe(topics, last_event_id)
+        if subscription is None:
+            return jsonify({
+                'success': False,
+                'error': 'Too many event stream clients'
+            }), 503
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    def generate():
+        yield 'retry: 3000\n\n'
+        if resync_id is not None:
+            yield _format(resync_id, 'resync', {'reason': 'missed events are no longer available'})
+        for event in missed:
+            yield _format(event['id'], event['topic'], event['data'])
+
+        while True:
+            events, overflow_id = subscription.wait(event_bus.keepalive)
+            if overflow_id is not None:
+                yield _format(overflow_id, 'resync', {'reason': 'client fell behind'})
+            elif not events:
+                yield ': keepalive\n\n'
+            for event in events:
+                yield _format(event['id'], event['topic'], event['data'])
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the client goes away, even before the first event
+    response.call_on_close(lambda: event_bus.unsubscribe(subscription))
+    return response
+
+@events_bp.route('/stats', methods=['GET'])
+def get_event_stats():
+    """Get event stream clients and counters"""
+    try:
+        return jsonify({
+            'success': True,
+            'events': event_bus.get_stats()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
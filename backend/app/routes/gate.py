@@ -6,7 +6,11 @@ Handle gate control API endpoints
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models.gate import Gate
+from app.services.gate_dispatcher import gate_dispatcher
+from app.services.gate_drivers import gate_drivers
 from app.services.gate_service import gate_service
+from app.services.plate_index import plate_index
+from app.services.response_cache import response_cache
 
 gate_bp = Blueprint('gate', __name__)
 
@@ -41,6 +45,12 @@ def add_gate():
                     'error': f'Missing required field: {field}'
                 }), 400
         
+        if data.get('control_method') and data['control_method'] not in gate_drivers.drivers:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported control method: {data['control_method']}"
+            }), 400
+        
         # Create new gate
         gate = Gate(
             name=data['name'],
@@ -56,6 +66,7 @@ def add_gate():
         
         db.session.add(gate)
         db.session.commit()
+        plate_index.set_gate(gate)
         
         return jsonify({
             'success': True,
@@ -94,18 +105,26 @@ def get_gate(gate_id):
 
 @gate_bp.route('/<int:gate_id>/open', methods=['POST'])
 def open_gate(gate_id):
-    """Open gate manually"""
+    """Open gate manually (queued; poll the returned command)"""
     try:
         data = request.get_json() or {}
         operator_name = data.get('operator_name', 'Unknown')
         reason = data.get('reason', 'Manual override')
         
-        result = gate_service.open_gate(gate_id, operator_name, reason)
+        if not Gate.query.get(gate_id):
+            return jsonify({
+                'success': False,
+                'error': 'Gate not found'
+            }), 404
         
-        if result['success']:
-            return jsonify(result)
-        else:
-            return jsonify(result), 400
+        command = gate_dispatcher.submit(gate_id, 'open', operator_name, reason)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Gate open command queued',
+            'command_id': command['id'],
+            'command': command
+        }), 202
             
     except Exception as e:
         return jsonify({
@@ -115,17 +134,25 @@ def open_gate(gate_id):
 
 @gate_bp.route('/<int:gate_id>/close', methods=['POST'])
 def close_gate(gate_id):
-    """Close gate manually"""
+    """Close gate manually (queued; poll the returned command)"""
     try:
         data = request.get_json() or {}
         operator_name = data.get('operator_name', 'Unknown')
         
-        result = gate_service.close_gate(gate_id, operator_name)
+        if not Gate.query.get(gate_id):
+            return jsonify({
+                'success': False,
+                'error': 'Gate not found'
+            }), 404
+        
+        command = gate_dispatcher.submit(gate_id, 'close', operator_name)
         
-        if result['success']:
-            return jsonify(result)
-        else:
-            return jsonify(result), 400
+        return jsonify({
+            'success': True,
+            'message': 'Gate close command queued',
+            'command_id': command['id'],
+            'command': command
+        }), 202
             
     except Exception as e:
         return jsonify({
@@ -133,6 +160,58 @@ def close_gate(gate_id):
             'error': str(e)
         }), 500
 
+@gate_bp.route('/commands/<command_id>', methods=['GET'])
+def get_gate_command(command_id):
+    """Get the state of a queued gate command"""
+    try:
+        command = gate_dispatcher.get_command(command_id)
+        if not command:
+            return jsonify({
+                'success': False,
+                'error': 'Command not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'command': command
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@gate_bp.route('/dispatcher', methods=['GET'])
+def get_dispatcher_status():
+    """Get gate command queues and dispatcher counters"""
+    try:
+        return jsonify({
+            'success': True,
+            'dispatcher': gate_dispatcher.get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@gate_bp.route('/drivers', methods=['GET'])
+def get_driver_stats():
+    """Get command round-trip times and connections per gate driver"""
+    try:
+        return jsonify({
+            'success': True,
+            'drivers': gate_drivers.get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @gate_bp.route('/<int:gate_id>/status', methods=['GET'])
 def get_gate_status(gate_id):
     """Get gate status"""
@@ -151,6 +230,7 @@ def get_gate_status(gate_id):
         }), 500
 
 @gate_bp.route('/status', methods=['GET'])
+@response_cache.cached('gates')
 def get_all_gates_status():
     """Get status of all gates"""
     try:
@@ -176,6 +256,12 @@ def update_gate(gate_id):
         
         data = request.get_json()
         
+        if data.get('control_method') and data['control_method'] not in gate_drivers.drivers:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported control method: {data['control_method']}"
+            }), 400
+        
         # Update fields if provided
         if 'name' in data:
             gate.name = data['name']
@@ -197,6 +283,7 @@ def update_gate(gate_id):
             gate.camera_id = data['camera_id']
         
         db.session.commit()
+        plate_index.set_gate(gate)
         
         return jsonify({
             'success': True,
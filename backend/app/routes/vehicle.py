@@ -7,6 +7,7 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
 from app import db
 from app.models.vehicle import Vehicle
+from app.services.plate_index import plate_index
 
 vehicle_bp = Blueprint('vehicle', __name__)
 
@@ -72,6 +73,7 @@ def add_vehicle():
         
         db.session.add(vehicle)
         db.session.commit()
+        plate_index.upsert(vehicle)
         
         return jsonify({
             'success': True,
@@ -127,6 +129,7 @@ def search_vehicle():
                 if datetime.utcnow() > vehicle.expires_at:
                     vehicle.status = 'expired'
                     db.session.commit()
+                    plate_index.upsert(vehicle)
             
             return jsonify({
                 'success': True,
@@ -149,6 +152,96 @@ def search_vehicle():
             'error': str(e)
         }), 500
 
+@vehicle_bp.route('/decision', methods=['GET'])
+def get_access_decision():
+    """Get access decision for a license plate from the in-memory index"""
+    try:
+        license_plate = request.args.get('license_plate')
+        if not license_plate:
+            return jsonify({
+                'success': False,
+                'error': 'License plate parameter required'
+            }), 400
+        
+        plate_index.ensure_loaded()
+        decision = plate_index.decide(license_plate, camera_id=request.args.get('camera_id', type=int))
+        
+        return jsonify({
+            'success': True,
+            'decision': decision,
+            'access_allowed': decision['access_allowed']
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@vehicle_bp.route('/match', methods=['GET'])
+def match_vehicle():
+    """Find registered vehicles similar to an ANPR plate read"""
+    try:
+        license_plate = request.args.get('license_plate')
+        if not license_plate:
+            return jsonify({
+                'success': False,
+                'error': 'License plate parameter required'
+            }), 400
+        
+        min_score = request.args.get('min_score', 0.5, type=float)
+        limit = request.args.get('limit', 5, type=int)
+        budget_ms = request.args.get('budget_ms', type=float)
+        
+        plate_index.ensure_loaded()
+        result = plate_index.match(license_plate, min_score, limit, budget_ms)
+        
+        return jsonify({
+            'success': True,
+            'candidates': result['candidates'],
+            'complete': result['complete'],
+            'total': len(result['candidates'])
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@vehicle_bp.route('/index', methods=['GET'])
+def get_index_stats():
+    """Get plate index statistics"""
+    try:
+        return jsonify({
+            'success': True,
+            'index': plate_index.get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@vehicle_bp.route('/index/reload', methods=['POST'])
+def reload_index():
+    """Reload plate index from the database"""
+    try:
+        size = plate_index.load()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Plate index reloaded',
+            'size': size
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @vehicle_bp.route('/<int:vehicle_id>/update', methods=['PUT'])
 def update_vehicle(vehicle_id):
     """Update vehicle information"""
@@ -177,6 +270,7 @@ def update_vehicle(vehicle_id):
             vehicle.status = data['status']
         
         db.session.commit()
+        plate_index.upsert(vehicle)
         
         return jsonify({
             'success': True,
@@ -204,6 +298,7 @@ def delete_vehicle(vehicle_id):
         
         db.session.delete(vehicle)
         db.session.commit()
+        plate_index.remove(vehicle_id)
         
         return jsonify({
             'success': True,
@@ -230,6 +325,8 @@ def get_temporary_vehicles():
                 vehicle.status = 'expired'
         
         db.session.commit()
+        for vehicle in temp_vehicles:
+            plate_index.upsert(vehicle)
         
         return jsonify({
             'success': True,
@@ -0,0 +1,328 @@
+"""
+Access Log Writer
+Write-behind buffer that stores access logs and gate status updates in
+batched transactions, backed by the local event journal
+"""
+
+import atexit
+import os
+import threading
+import time
+import uuid
+from app import db
+from app.models.access_log import AccessLog
+from app.models.gate import Gate
+from app.services.access_rollups import access_rollups
+from app.services.event_bus import access_event, event_bus
+from app.services.event_journal import decode_row, event_journal
+from app.services.response_cache import response_cache
+from app.services.status_sync import status_sync
+
+class AccessLogWriter:
+    def __init__(self):
+        self.batch_size = int(os.getenv('ACCESS_LOG_BATCH_SIZE', 200))
+        self.flush_interval = float(os.getenv('ACCESS_LOG_FLUSH_INTERVAL', 0.5))
+        self.max_buffer = int(os.getenv('ACCESS_LOG_BUFFER_MAX', 50000))
+        self._rows = []           # (row, journal offset, on_written callback)
+        self._amendments = []     # (event_id, changed columns, journal offset)
+        self._gate_updates = {}   # gate id -> changed columns
+        self._writing_gate_updates = {}   # taken by a flush, not committed yet
+        self._first_pending_at = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._app = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = None
+        self.last_error = None
+
+    def start(self, app):
+        """Start the flush thread once per process"""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return False
+
+            self._app = app
+            self._stopping = False
+            event_journal.open(
+                os.getenv('ACCESS_JOURNAL_DIR') or os.path.join(app.instance_path, 'journal')
+            )
+            self._thread = threading.Thread(target=self._run, name='access-log-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+            return True
+
+    def add_access_log(self, row, on_written=None):
+        """Journal one access log row and buffer it for the database
+
+        row is a dict of AccessLog columns. on_written(success) runs after
+        the row is committed, or with False if it is given up on; rows
+        that fail while journaled are left to the journal replay instead.
+        """
+        row.setdefault('event_id', uuid.uuid4().hex)
+        offset = event_journal.append(row)
+
+        with self._cond:
+            if len(self._rows) >= self.max_buffer:
+                # Keep the newest events in memory; the journal still has the rest
+                _, dropped_offset, dropped_callback = self._rows.pop(0)
+                if dropped_offset is None:
+                    self.dropped += 1
+                    if dropped_callback:
+                        dropped_callback(False)
+                else:
+                    event_journal.request_replay()
+
+            self._rows.append((row, offset, on_written))
+            self._mark_pending()
+        # Published once journaled; the journal guarantees the row is stored
+        event_bus.publish('access', access_event(row))
+
+    def amend_access_log(self, event_id, **fields):
+        """Journal a change to a logged row and buffer it for the database
+
+        Used when a better read of the same car arrives after its row was
+        logged. The change is applied after the row is stored, whether the
+        row is still buffered, already written or waiting for the replay.
+        """
+        offset = event_journal.append_amendment(event_id, fields)
+
+        with self._cond:
+            self._amendments.append((event_id, fields, offset))
+            self._mark_pending()
+
+    def update_gate(self, gate_id, **fields):
+        """Buffer a gate status change; later changes to a column win"""
+        with self._cond:
+            self._gate_updates.setdefault(gate_id, {}).update(fields)
+            self._mark_pending()
+        # Gate status responses overlay buffered changes
+        response_cache.invalidate('gates')
+        status_sync.record('gate', [gate_id])
+
+    def pending_gate_updates(self):
+        """Get gate changes that are not in the database yet"""
+        with self._cond:
+            pending = {gate_id: dict(fields) for gate_id, fields in self._writing_gate_updates.items()}
+            for gate_id, fields in self._gate_updates.items():
+                pending.setdefault(gate_id, {}).update(fields)
+            return pending
+
+    def flush(self):
+        """Write everything buffered now in one transaction
+
+        Returns the number of rows written; on failure the batch goes back
+        to the front of the buffer.
+        """
+        with self._cond:
+            rows, self._rows = self._rows, []
+            amendments, self._amendments = self._amendments, []
+            gate_updates, self._gate_updates = self._gate_updates, {}
+            self._writing_gate_updates = gate_updates
+            self._first_pending_at = None
+
+        if not rows and not amendments and not gate_updates:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            mappings = self._missing([row for row, _, _ in rows])
+            if mappings:
+                db.session.bulk_insert_mappings(AccessLog, mappings)
+                access_rollups.add(mappings)
+            unmatched = self._apply_amendments(amendments)
+            if gate_updates:
+                db.session.bulk_update_mappings(
+                    Gate, [dict(fields, id=gate_id) for gate_id, fields in gate_updates.items()]
+                )
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Failed to write {len(rows)} access logs: {e}")
+            # Journaled rows come back through the replay once the database recovers
+            unjournaled = [item for item in rows if item[1] is None]
+            unjournaled_amendments = [item for item in amendments if item[2] is None]
+            if (len(unjournaled) < len(rows)
+                    or len(unjournaled_amendments) < len(amendments)):
+                event_journal.request_replay()
+            self._requeue(unjournaled, unjournaled_amendments, gate_updates)
+            return 0
+
+        finally:
+            with self._cond:
+                self._writing_gate_updates = {}
+
+        # An amendment whose row is not stored yet (it is waiting for the
+        # replay) stays in the journal and is applied after that row
+        if unmatched and event_journal.request_replay():
+            amendments = [item for item in amendments if item not in unmatched]
+        event_journal.commit(
+            [offset for _, offset, _ in rows] + [offset for _, _, offset in amendments]
+        )
+        self.written += len(mappings)
+        self.batches += 1
+        self.last_batch_size = len(rows)
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.last_error = None
+
+        for _, _, on_written in rows:
+            if on_written:
+                on_written(True)
+        return len(rows)
+
+    def replay(self):
+        """Apply journal records that are not in the database yet
+
+        Safe to repeat: rows whose event_id is already stored are skipped.
+        Returns the number of rows inserted.
+        """
+        if not event_journal.is_open():
+            return 0
+
+        inserted = 0
+        for records, next_offset in event_journal.read_pending():
+            try:
+                mappings = self._missing([
+                    decode_row(record) for _, record in records if record and 'row' in record
+                ])
+                if mappings:
+                    db.session.bulk_insert_mappings(AccessLog, mappings)
+                    access_rollups.add(mappings)
+                self._apply_amendments([
+                    (record['event_id'], record['amend'], offset)
+                    for offset, record in records if record and 'amend' in record
+                ])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            inserted += len(mappings)
+            event_journal.mark_replayed(records, next_offset, len(mappings))
+
+        event_journal.finish_replay()
+        self.written += inserted
+        if inserted:
+            print(f"✅ Replayed {inserted} access logs from the journal")
+        return inserted
+
+    def stop(self):
+        """Stop the flush thread and write whatever is still buffered"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        if self._app and (self._rows or self._amendments or self._gate_updates):
+            with self._app.app_context():
+                self.flush()
+        event_journal.close()
+
+    def get_stats(self):
+        """Get buffer depth and batch counters"""
+        with self._cond:
+            buffered = len(self._rows)
+            amendments = len(self._amendments)
+            gates = len(self._gate_updates)
+
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'buffered': buffered,
+            'buffered_amendments': amendments,
+            'buffered_gate_updates': gates,
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'failures': self.failures,
+            'last_batch_size': self.last_batch_size,
+            'last_flush_ms': self.last_flush_ms,
+            'last_error': self.last_error
+        }
+
+    def _mark_pending(self):
+        if self._first_pending_at is None:
+            self._first_pending_at = time.monotonic()
+        if len(self._rows) >= self.batch_size:
+            self._cond.notify()
+        elif len(self._rows) + len(self._amendments) + len(self._gate_updates) == 1:
+            self._cond.notify()   # start the flush timer
+
+    def _run(self):
+        while True:
+            if event_journal.replay_needed:
+                failures = self.failures
+                with self._app.app_context():
+                    try:
+                        self.replay()
+                    except Exception as e:
+                        self.failures += 1
+                        self.last_error = str(e)
+                if self.failures > failures:
+                    # Back off, but still write what is buffered below
+                    time.sleep(min(self.flush_interval * 4, 5))
+
+            with self._cond:
+                while not self._stopping:
+                    if self._first_pending_at is None:
+                        if event_journal.replay_needed:
+                            break
+                        self._cond.wait(self.flush_interval)
+                        continue
+                    if len(self._rows) >= self.batch_size:
+                        break
+                    remaining = self._first_pending_at + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopping:
+                    return
+
+            failures = self.failures
+            with self._app.app_context():
+                self.flush()
+            if self.failures > failures:
+                # Back off before retrying a failed write
+                time.sleep(min(self.flush_interval * 4, 5))
+
+    def _missing(self, rows):
+        """Drop rows whose event_id is already stored (or repeated in the batch)"""
+        unique = {row['event_id']: row for row in rows}
+        if not unique:
+            return []
+
+        stored = {
+            event_id for (event_id,) in
+            db.session.query(AccessLog.event_id).filter(AccessLog.event_id.in_(list(unique)))
+        }
+        return [row for event_id, row in unique.items() if event_id not in stored]
+
+    def _apply_amendments(self, amendments):
+        """Update stored rows; returns the amendments that matched no row"""
+        unmatched = []
+        for item in amendments:
+            event_id, fields, _ = item
+            updated = db.session.query(AccessLog).filter(
+                AccessLog.event_id == event_id
+            ).update(fields, synchronize_session=False)
+            if not updated:
+                unmatched.append(item)
+        return unmatched
+
+    def _requeue(self, rows, amendments, gate_updates):
+        with self._cond:
+            self._rows = rows + self._rows
+            self._amendments = amendments + self._amendments
+            for gate_id, fields in gate_updates.items():
+                self._gate_updates[gate_id] = dict(fields, **self._gate_updates.get(gate_id, {}))
+            if self._rows or self._amendments or self._gate_updates:
+                self._first_pending_at = self._first_pending_at or time.monotonic()
+
+# Global access log writer instance
+access_log_writer = AccessLogWriter()
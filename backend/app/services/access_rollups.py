@@ -0,0 +1,137 @@
+"""
+Access Rollups Service
+Hourly access counts kept up to date as access logs are written, so the
+charts never aggregate raw access_logs
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app import db
+from app.models.access_log import AccessLog
+from app.models.access_rollup import AccessRollup
+
+def hour_of(timestamp):
+    """Start of the hour a timestamp falls in"""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def _same(column, value):
+    return column.is_(None) if value is None else column == value
+
+class AccessRollups:
+    def add(self, rows):
+        """Count newly inserted access log rows into their hourly buckets
+
+        Runs inside the caller's transaction, so the counts commit (or roll
+        back) together with the rows. Two writers creating the same bucket
+        at once leave two rows for it; readers sum them.
+        """
+        buckets = Counter(
+            (hour_of(row.get('timestamp') or datetime.utcnow()), row.get('gate_id'),
+             row['event_type'], row.get('access_method'))
+            for row in rows
+        )
+
+        for (hour, gate_id, event_type, access_method), count in buckets.items():
+            bucket_id = db.session.query(AccessRollup.id).filter(
+                AccessRollup.hour == hour,
+                _same(AccessRollup.gate_id, gate_id),
+                AccessRollup.event_type == event_type,
+                _same(AccessRollup.access_method, access_method)
+            ).order_by(AccessRollup.id).limit(1).scalar()
+
+            if bucket_id is None:
+                db.session.add(AccessRollup(
+                    hour=hour, gate_id=gate_id, event_type=event_type,
+                    access_method=access_method, count=count
+                ))
+            else:
+                db.session.query(AccessRollup).filter(AccessRollup.id == bucket_id).update(
+                    {AccessRollup.count: AccessRollup.count + count}, synchronize_session=False
+                )
+
+    def daily_counts(self, start):
+        """Get entries and exits per day since start, oldest day first
+
+        Whole hours come from the rollups; the part of the first hour
+        before it ends is counted from access_logs.
+        """
+        first_hour = hour_of(start)
+        if first_hour < start:
+            first_hour += timedelta(hours=1)
+
+        hourly = db.session.query(
+            AccessRollup.hour, AccessRollup.event_type, func.sum(AccessRollup.count)
+        ).filter(
+            AccessRollup.hour >= first_hour
+        ).group_by(
+            AccessRollup.hour, AccessRollup.event_type
+        ).all()
+
+        edge = db.session.query(
+            AccessLog.event_type, func.count(AccessLog.id)
+        ).filter(
+            AccessLog.timestamp >= start,
+            AccessLog.timestamp < first_hour
+        ).group_by(
+            AccessLog.event_type
+        ).all()
+
+        days = {}
+        counts = [(hour, event_type, count) for hour, event_type, count in hourly]
+        counts += [(start, event_type, count) for event_type, count in edge]
+        for timestamp, event_type, count in counts:
+            day = days.setdefault(timestamp.strftime('%Y-%m-%d'), {'entries': 0, 'exits': 0})
+            if event_type == 'entry':
+                day['entries'] += int(count)
+            elif event_type == 'exit':
+                day['exits'] += int(count)
+
+        return [dict(date=date, **day) for date, day in sorted(days.items())]
+
+    def backfill(self, since=None):
+        """Rebuild the rollups from access_logs (all time, or from since)
+
+        Run it with the server stopped or idle: rows written while it runs
+        may be counted twice. Returns (buckets, rows) rebuilt.
+        """
+        start = hour_of(since) if since else None
+
+        try:
+            stale = db.session.query(AccessRollup)
+            raw = db.session.query(
+                AccessLog.timestamp, AccessLog.gate_id, AccessLog.event_type, AccessLog.access_method
+            )
+            if start:
+                stale = stale.filter(AccessRollup.hour >= start)
+                raw = raw.filter(AccessLog.timestamp >= start)
+            stale.delete(synchronize_session=False)
+
+            buckets = Counter()
+            rows = 0
+            for timestamp, gate_id, event_type, access_method in raw.yield_per(5000):
+                if timestamp is None:
+                    continue
+                buckets[(hour_of(timestamp), gate_id, event_type, access_method)] += 1
+                rows += 1
+
+            db.session.bulk_insert_mappings(AccessRollup, [
+                {'hour': hour, 'gate_id': gate_id, 'event_type': event_type,
+                 'access_method': access_method, 'count': count}
+                for (hour, gate_id, event_type, access_method), count in buckets.items()
+            ])
+            db.session.commit()
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return len(buckets), rows
+
+    def needs_backfill(self):
+        """True if access logs exist but no rollups do (tables just upgraded)"""
+        return (db.session.query(AccessRollup.id).first() is None
+                and db.session.query(AccessLog.id).first() is not None)
+
+# Global access rollups instance
+access_rollups = AccessRollups()
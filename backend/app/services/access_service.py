@@ -0,0 +1,137 @@
+"""
+Access Service
+Turn ANPR plate events into access decisions, gate commands and access logs
+"""
+
+import os
+import time
+import uuid
+from datetime import datetime
+from functools import partial
+from flask import current_app
+from app.services.gate_dispatcher import gate_dispatcher
+from app.services.pipeline_metrics import PipelineTrace, pipeline_metrics
+from app.services.plate_index import plate_index
+
+class AccessService:
+    def __init__(self):
+        self.auto_open = os.getenv('PIPELINE_AUTO_OPEN', 'True').lower() == 'true'
+        self.command_timeout = float(os.getenv('GATE_COMMAND_TIMEOUT', 2))
+
+    def handle_event(self, event):
+        """Decide one event and queue its gate open; returns (decision, event, trace)
+
+        Only in-memory state is used, so the barrier never waits on the
+        database. The open command goes to the gate's own dispatcher queue,
+        so a dead controller holds up only its own lane. The trace is
+        recorded when the command finishes (right away if none is sent).
+        Building and storing the access log is left to the caller.
+        """
+        trace = PipelineTrace(event.get('received_at') or time.monotonic())
+        trace.license_plate = event['license_plate']
+
+        decision = self.decide(event)
+        trace.mark('decided', time.monotonic())
+
+        gate = plate_index.gate_for_camera(event.get('camera_id'))
+        trace.gate_id = gate['id'] if gate else None
+        decision['gate_id'] = trace.gate_id
+
+        if not decision['access_allowed']:
+            trace.outcome = 'denied'
+        elif not gate:
+            trace.outcome = 'no_gate'
+        elif not self.auto_open:
+            trace.outcome = 'auto_open_disabled'
+        else:
+            trace.outcome = 'queued'
+            gate_dispatcher.submit(
+                gate['id'], 'open', gate=gate, timeout=self.command_timeout,
+                on_done=partial(self._gate_done, trace)
+            )
+        decision['gate_action'] = trace.outcome
+
+        if trace.outcome != 'queued':
+            pipeline_metrics.record(trace)
+        return decision, event, trace
+
+    def _gate_done(self, trace, result, sent_at):
+        # A command coalesced into one already running was sent before this read
+        trace.mark('command_sent', max(sent_at, trace.marks['decided']))
+        if result['success']:
+            trace.mark('gate_open', time.monotonic())
+            trace.outcome = 'opened'
+        else:
+            trace.outcome = 'command_failed'
+        pipeline_metrics.record(trace)
+
+    def decide(self, event):
+        """Authorize a plate from the in-memory index
+
+        Denies while the index is not loaded (the database was unreachable
+        at start-up) rather than querying the database.
+        """
+        if not plate_index.loaded:
+            return {
+                'license_plate': event['license_plate'],
+                'registered': False,
+                'access_allowed': False,
+                'reason': 'index_unavailable',
+                'vehicle_id': None
+            }
+
+        return plate_index.decide(
+            event['license_plate'], camera_id=event.get('camera_id'), now=event['timestamp']
+        )
+
+    def build_access_row(self, event, decision, gate_id=None):
+        """Build the AccessLog column values for a decided event"""
+        if decision['access_allowed']:
+            event_type = 'exit' if event.get('direction') == 'exit' else 'entry'
+        else:
+            event_type = 'denied'
+
+        return {
+            'event_id': event.get('event_id') or uuid.uuid4().hex,
+            'vehicle_id': decision['vehicle_id'],
+            'camera_id': event.get('camera_id'),
+            'gate_id': gate_id,
+            'license_plate': (decision['license_plate'] if decision['registered']
+                              else event['license_plate'])[:20],
+            'event_type': event_type,
+            'access_method': 'anpr',
+            'confidence_score': event.get('confidence'),
+            'image_path': self._save_image(event),
+            'timestamp': event['timestamp'],
+            'created_at': datetime.utcnow()
+        }
+
+    def build_amendment(self, event):
+        """Build the AccessLog column changes for a better read of a logged car"""
+        fields = {'confidence_score': event.get('confidence')}
+        image_path = self._save_image(event)
+        if image_path:
+            fields['image_path'] = image_path
+        return fields
+
+    def _save_image(self, event):
+        """Store the plate picture on disk and return its path"""
+        image = event.get('image')
+        if not image:
+            return None
+
+        directory = os.getenv('ANPR_IMAGE_DIR') or os.path.join(current_app.instance_path, 'anpr')
+        filename = f"{event['timestamp']:%Y%m%d%H%M%S%f}_{event.get('camera_id') or 0}.jpg"
+        path = os.path.join(directory, filename)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(image)
+        except OSError as e:
+            # Keep the access record even if the picture cannot be stored
+            print(f"Failed to store ANPR image {path}: {e}")
+            return None
+        return path
+
+# Global access service instance
+access_service = AccessService()
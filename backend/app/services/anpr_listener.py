@@ -0,0 +1,265 @@
+"""
+ANPR Listener Service
+Consume the Hikvision ISAPI alertStream of every ANPR-enabled camera
+"""
+
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+import requests
+from app.models.camera import Camera
+from app.services.device_http import device_http
+from app.services.ingest_service import ingest_service
+from app.utils.multipart import MultipartStreamParser, get_boundary
+
+ALERT_STREAM_PATH = '/ISAPI/Event/notification/alertStream'
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _find_text(root, name):
+    for element in root.iter():
+        if _local_name(element.tag) == name and element.text:
+            return element.text.strip()
+    return None
+
+def _parse_datetime(value):
+    """Parse an ISAPI timestamp into a naive UTC datetime"""
+    if value:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if parsed.tzinfo:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+def _parse_direction(value):
+    return {'forward': 'entry', 'reverse': 'exit'}.get((value or '').lower())
+
+def parse_alert(headers, body):
+    """Parse one alertStream part into an ANPR event dict, or None
+
+    Returns (event, picture_count) for ANPR alerts.
+    """
+    content_type = headers.get('content-type', '').lower()
+
+    if 'json' in content_type:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        if data.get('eventType') != 'ANPR':
+            return None
+        anpr = data.get('ANPR', {})
+        plate = anpr.get('licensePlate')
+        confidence = anpr.get('confidenceLevel')
+        timestamp = data.get('dateTime')
+        direction = anpr.get('direction')
+        pictures = int(anpr.get('picNum') or data.get('picNum') or 0)
+
+    elif 'xml' in content_type or body.lstrip().startswith(b'<'):
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError:
+            return None
+        if _find_text(root, 'eventType') != 'ANPR':
+            return None
+        plate = _find_text(root, 'licensePlate')
+        confidence = _find_text(root, 'confidenceLevel')
+        timestamp = _find_text(root, 'dateTime')
+        direction = _find_text(root, 'direction')
+        pictures = int(_find_text(root, 'picNum') or 0)
+
+    else:
+        return None
+
+    if not plate or plate.lower() == 'unknown':
+        return None
+
+    try:
+        confidence = float(confidence) / 100 if confidence is not None else None
+    except ValueError:
+        confidence = None
+
+    event = {
+        'license_plate': plate,
+        'confidence': confidence,
+        'timestamp': _parse_datetime(timestamp),
+        'direction': _parse_direction(direction)
+    }
+    return event, pictures
+
+class AnprListener:
+    def __init__(self):
+        self.enabled = os.getenv('ANPR_LISTENER_ENABLED', 'True').lower() == 'true'
+        self.refresh_interval = float(os.getenv('ANPR_LISTENER_REFRESH_INTERVAL', 60))
+        self.max_backoff = float(os.getenv('ANPR_LISTENER_MAX_BACKOFF', 60))
+        self.read_timeout = float(os.getenv('ANPR_LISTENER_READ_TIMEOUT', 90))
+        self.listeners = {}   # camera id -> listener state
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, app):
+        """Start the supervisor thread once per process"""
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._supervise, args=(app,), name='anpr-listener', daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self):
+        """Stop the supervisor and every camera listener"""
+        self._stop.set()
+        for state in list(self.listeners.values()):
+            state['stop'].set()
+
+    def get_status(self):
+        """Get connection state and counters per camera"""
+        listeners = []
+        for camera_id, state in sorted(list(self.listeners.items())):
+            listeners.append({
+                'camera_id': camera_id,
+                'url': state['target']['url'],
+                'connected': state['connected'],
+                'events': state['events'],
+                'reconnects': state['reconnects'],
+                'last_event_at': state['last_event_at'],
+                'error': state['error']
+            })
+
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'listeners': listeners,
+            'total': len(listeners)
+        }
+
+    def _supervise(self, app):
+        while not self._stop.is_set():
+            try:
+                with app.app_context():
+                    cameras = Camera.query.filter_by(anpr_enabled=True).all()
+                    targets = {camera.id: self._camera_target(camera) for camera in cameras}
+                self._sync_listeners(targets)
+            except Exception as e:
+                print(f"ANPR listener supervisor error: {e}")
+
+            self._stop.wait(self.refresh_interval)
+
+    def _camera_target(self, camera):
+        return {
+            'camera_id': camera.id,
+            'url': f"http://{camera.ip_address}:{camera.port or 80}{ALERT_STREAM_PATH}",
+            'username': camera.username,
+            'password': camera.password
+        }
+
+    def _sync_listeners(self, targets):
+        for camera_id, state in list(self.listeners.items()):
+            if targets.get(camera_id) != state['target']:
+                state['stop'].set()
+                del self.listeners[camera_id]
+
+        for camera_id, target in targets.items():
+            if camera_id in self.listeners:
+                continue
+            state = {
+                'target': target,
+                'stop': threading.Event(),
+                'connected': False,
+                'events': 0,
+                'reconnects': 0,
+                'last_event_at': None,
+                'error': None
+            }
+            self.listeners[camera_id] = state
+            threading.Thread(
+                target=self._listen, args=(state,),
+                name=f'anpr-camera-{camera_id}', daemon=True
+            ).start()
+
+    def _listen(self, state):
+        """Keep one alertStream connection open, reconnecting with backoff"""
+        target = state['target']
+        backoff = 1
+
+        while not state['stop'].is_set():
+            try:
+                response = device_http.get(
+                    target['url'], target['username'], target['password'],
+                    stream=True, timeout=(5, self.read_timeout)
+                )
+                try:
+                    if response.status_code != 200:
+                        raise requests.exceptions.HTTPError(f'HTTP {response.status_code}')
+
+                    state['connected'] = True
+                    state['error'] = None
+                    backoff = 1
+                    self._consume(state, response)
+                finally:
+                    response.close()
+
+            except Exception as e:
+                state['error'] = str(e)
+
+            state['connected'] = False
+            if state['stop'].is_set():
+                break
+
+            state['reconnects'] += 1
+            state['stop'].wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _consume(self, state, response):
+        parser = MultipartStreamParser(get_boundary(response.headers.get('Content-Type')))
+        pending = None      # ANPR event still waiting for its pictures
+        remaining = 0
+
+        try:
+            for chunk in response.iter_content(chunk_size=8192):
+                if state['stop'].is_set():
+                    return
+
+                for headers, body in parser.feed(chunk):
+                    if pending and headers.get('content-type', '').lower().startswith('image/'):
+                        # The first picture is the plate close-up
+                        pending.setdefault('image', body)
+                        remaining -= 1
+                    else:
+                        if pending:
+                            self._dispatch(state, pending)
+                            pending = None
+                        parsed = parse_alert(headers, body)
+                        if parsed:
+                            pending, remaining = parsed
+                            pending['camera_id'] = state['target']['camera_id']
+
+                    if pending and remaining <= 0:
+                        self._dispatch(state, pending)
+                        pending = None
+        finally:
+            # The stream ended, reset or failed before all pictures came:
+            # keep the plate read without them
+            if pending:
+                self._dispatch(state, pending)
+
+    def _dispatch(self, state, event):
+        state['events'] += 1
+        state['last_event_at'] = datetime.utcnow().isoformat()
+        ingest_service.submit(event)
+
+# Global ANPR listener instance
+anpr_listener = AnprListener()
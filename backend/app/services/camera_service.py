@@ -3,12 +3,18 @@ Camera Service - MVP Version
 Handle camera connections and streaming
 """
 
+import atexit
 import cv2
+import os
 import requests
 import base64
+import hashlib
 from datetime import datetime
 from app import db
 from app.models.camera import Camera
+from app.services.device_http import device_http
+from app.services.frame_grabber import FrameGrabber
+from app.services.snapshot_cache import snapshot_cache
 import threading
 import time
 
@@ -16,6 +22,13 @@ class CameraService:
     def __init__(self):
         self.active_streams = {}
         self.stream_threads = {}
+        self.stream_buffer_frames = int(os.getenv('STREAM_BUFFER_FRAMES', 1))
+        self.stream_buffer_max_bytes = int(os.getenv('STREAM_BUFFER_MAX_BYTES', 32 * 1024 * 1024))
+        self.stream_idle_timeout = float(os.getenv('STREAM_IDLE_TIMEOUT', 30))
+        self._streams_lock = threading.Lock()
+        
+        # Let decoder threads leave OpenCV before the interpreter exits
+        atexit.register(self.stop_all_streams)
     
     def test_camera_connection(self, camera_id):
         """Test camera connection and update status"""
@@ -28,12 +41,9 @@ class CameraService:
             snapshot_url = camera.get_snapshot_url()
             
             try:
-                # Add authentication if available
-                auth = None
-                if camera.username and camera.password:
-                    auth = (camera.username, camera.password)
-                
-                response = requests.get(snapshot_url, auth=auth, timeout=10)
+                response = device_http.get(
+                    snapshot_url, camera.username, camera.password, timeout=10
+                )
                 
                 if response.status_code == 200:
                     # Update camera status
@@ -69,8 +79,15 @@ class CameraService:
                 'error': f'Service error: {str(e)}'
             }
     
-    def get_camera_snapshot(self, camera_id):
-        """Get a single snapshot from camera"""
+    def fetch_snapshot(self, camera_id):
+        """Get raw snapshot bytes, shared between concurrent viewers"""
+        return snapshot_cache.get_or_fetch(
+            camera_id,
+            lambda: self._fetch_snapshot_upstream(camera_id)
+        )
+    
+    def _fetch_snapshot_upstream(self, camera_id):
+        """Fetch raw snapshot bytes from camera"""
         try:
             camera = Camera.query.get(camera_id)
             if not camera:
@@ -78,21 +95,21 @@ class CameraService:
             
             snapshot_url = camera.get_snapshot_url()
             
-            # Add authentication if available
-            auth = None
-            if camera.username and camera.password:
-                auth = (camera.username, camera.password)
-            
-            response = requests.get(snapshot_url, auth=auth, timeout=10)
+            response = device_http.get(
+                snapshot_url, camera.username, camera.password, timeout=10
+            )
             
             if response.status_code == 200:
-                # Convert image to base64 for web display
-                image_base64 = base64.b64encode(response.content).decode('utf-8')
+                content_type = response.headers.get('Content-Type', '')
+                if not content_type.startswith('image/'):
+                    content_type = 'image/jpeg'
                 
                 return {
                     'success': True,
-                    'image': f"data:image/jpeg;base64,{image_base64}",
-                    'timestamp': datetime.utcnow().isoformat()
+                    'content': response.content,
+                    'content_type': content_type,
+                    'etag': hashlib.sha1(response.content).hexdigest(),
+                    'timestamp': datetime.utcnow()
                 }
             else:
                 return {
@@ -106,6 +123,21 @@ class CameraService:
                 'error': f'Snapshot error: {str(e)}'
             }
     
+    def get_camera_snapshot(self, camera_id):
+        """Get a single snapshot from camera as a base64 data URI"""
+        result = self.fetch_snapshot(camera_id)
+        if not result['success']:
+            return result
+        
+        # Convert image to base64 for web display
+        image_base64 = base64.b64encode(result['content']).decode('utf-8')
+        
+        return {
+            'success': True,
+            'image': f"data:{result['content_type']};base64,{image_base64}",
+            'timestamp': result['timestamp'].isoformat()
+        }
+    
     def start_rtsp_stream(self, camera_id):
         """Start RTSP stream for camera (for future use)"""
         try:
@@ -115,6 +147,15 @@ class CameraService:
             
             rtsp_url = camera.get_rtsp_url()
             
+            # Reuse the shared decoder instead of opening another session
+            grabber = self.active_streams.get(camera_id)
+            if grabber and grabber.connected and grabber.latest():
+                return {
+                    'success': True,
+                    'message': 'RTSP stream accessible',
+                    'rtsp_url': rtsp_url
+                }
+            
             # Test RTSP connection
             cap = cv2.VideoCapture(rtsp_url)
             
@@ -149,6 +190,122 @@ class CameraService:
                 'error': f'RTSP error: {str(e)}'
             }
     
+    def acquire_stream(self, camera_id):
+        """Get the shared frame grabber for a camera, starting it if needed"""
+        with self._streams_lock:
+            grabber = self.active_streams.get(camera_id)
+            
+            if grabber is None or grabber.stopped.is_set():
+                camera = Camera.query.get(camera_id)
+                if not camera:
+                    return None
+                
+                grabber = FrameGrabber(
+                    camera_id,
+                    camera.get_rtsp_url(),
+                    buffer_size=self.stream_buffer_frames,
+                    max_bytes=self.stream_buffer_max_bytes,
+                    idle_timeout=self.stream_idle_timeout,
+                    on_idle=self._on_stream_idle
+                )
+                thread = threading.Thread(
+                    target=grabber.run, name=f'rtsp-camera-{camera_id}', daemon=True
+                )
+                self.active_streams[camera_id] = grabber
+                self.stream_threads[camera_id] = thread
+                thread.start()
+            
+            grabber.acquire()
+            return grabber
+    
+    def release_stream(self, grabber):
+        """Release a frame grabber obtained from acquire_stream"""
+        grabber.release()
+    
+    def stop_stream(self, camera_id):
+        """Stop a camera's decoder regardless of consumers"""
+        with self._streams_lock:
+            grabber = self.active_streams.pop(camera_id, None)
+            self.stream_threads.pop(camera_id, None)
+        
+        if grabber:
+            grabber.stop()
+        return grabber is not None
+    
+    def generate_mjpeg(self, grabber, fps=5, stall_timeout=10):
+        """Yield multipart MJPEG parts from a shared grabber
+        
+        Each client takes the newest frame at its own rate, so a slow client
+        skips frames instead of building up a backlog.
+        """
+        interval = 1.0 / fps
+        last_seq = 0
+        try:
+            while not grabber.stopped.is_set():
+                started = time.monotonic()
+                frame = grabber.wait_for_frame(last_seq, stall_timeout)
+                if frame is None:
+                    break
+                
+                last_seq = frame.seq
+                jpeg = frame.jpeg()
+                yield (
+                    b'--frame\r\n'
+                    b'Content-Type: image/jpeg\r\n'
+                    b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n\r\n'
+                    + jpeg + b'\r\n'
+                )
+                
+                delay = interval - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        finally:
+            self.release_stream(grabber)
+    
+    def stop_all_streams(self, timeout=2):
+        """Stop every decoder and wait briefly for the threads to finish"""
+        with self._streams_lock:
+            grabbers = list(self.active_streams.values())
+            threads = list(self.stream_threads.values())
+            self.active_streams.clear()
+            self.stream_threads.clear()
+        
+        for grabber in grabbers:
+            grabber.stop()
+        for thread in threads:
+            thread.join(timeout)
+    
+    def get_streams_status(self):
+        """Get status of all running decoders"""
+        streams = [grabber.get_stats() for grabber in list(self.active_streams.values())]
+        return {
+            'success': True,
+            'streams': streams,
+            'total': len(streams)
+        }
+    
+    def _on_stream_idle(self, grabber):
+        """Called by an idle grabber; returns True if it may shut down"""
+        with self._streams_lock:
+            if grabber.refs:
+                return False
+            
+            if self.active_streams.get(grabber.camera_id) is grabber:
+                del self.active_streams[grabber.camera_id]
+                self.stream_threads.pop(grabber.camera_id, None)
+            return True
+    
+    def status_dict(self, camera):
+        """Get the status fields of one camera"""
+        return {
+            'id': camera.id,
+            'name': camera.name,
+            'ip_address': camera.ip_address,
+            'status': camera.status,
+            'last_heartbeat': camera.last_heartbeat.isoformat() if camera.last_heartbeat else None,
+            'location': camera.location
+        }
+    
     def get_all_cameras_status(self):
         """Get status of all cameras"""
         try:
@@ -156,15 +313,7 @@ class CameraService:
             camera_status = []
             
             for camera in cameras:
-                status = {
-                    'id': camera.id,
-                    'name': camera.name,
-                    'ip_address': camera.ip_address,
-                    'status': camera.status,
-                    'last_heartbeat': camera.last_heartbeat.isoformat() if camera.last_heartbeat else None,
-                    'location': camera.location
-                }
-                camera_status.append(status)
+                camera_status.append(self.status_dict(camera))
             
             return {
                 'success': True,
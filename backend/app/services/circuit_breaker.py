@@ -0,0 +1,88 @@
+"""
+Circuit Breaker
+Fail fast on devices that are known to be unreachable
+"""
+
+import threading
+import time
+from datetime import datetime
+import requests
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of contacting a device whose breaker is open"""
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open trial -> closed
+
+    While open every call fails immediately. Once reset_timeout has passed
+    a single trial request is let through; its outcome closes the breaker
+    or re-opens it for another period.
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.last_error = None
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._retry_at = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now"""
+        with self._lock:
+            if self.state == 'closed':
+                return
+
+            if self._trial_in_flight or time.monotonic() < self._retry_at:
+                self.rejected += 1
+                retry_in = max(self._retry_at - time.monotonic(), 0)
+                raise CircuitOpenError(
+                    f'Circuit open for {self.name} (retry in {retry_in:.0f}s): {self.last_error}'
+                )
+
+            self.state = 'half_open'
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self._trial_in_flight = False
+
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state == 'closed':
+                    self.times_opened += 1
+                    self.opened_at = datetime.utcnow()
+                self.state = 'open'
+                self._retry_at = time.monotonic() + self.reset_timeout
+
+    def reset(self):
+        """Close the breaker by hand"""
+        self.record_success()
+
+    def get_state(self):
+        with self._lock:
+            retry_in = max(self._retry_at - time.monotonic(), 0) if self.state == 'open' else None
+            return {
+                'name': self.name,
+                'state': self.state,
+                'failures': self.failures,
+                'last_error': self.last_error,
+                'opened_at': self.opened_at.isoformat() if self.opened_at else None,
+                'retry_in': round(retry_in, 1) if retry_in is not None else None,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,85 @@
+"""
+Dashboard Stats Service
+Per-table breakdowns for the dashboard, each in one grouped query
+"""
+
+from sqlalchemy import case, func
+from app import db
+from app.models.vehicle import Vehicle
+from app.models.camera import Camera
+from app.models.gate import Gate
+from app.models.access_log import AccessLog
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def _counts(query):
+    # SUM comes back as Decimal on some databases
+    return [int(value) for value in query.one()]
+
+class DashboardStats:
+    def vehicle_counts(self):
+        """Count vehicles by permanence and status"""
+        row = _counts(db.session.query(
+            func.count(Vehicle.id),
+            _count_if(Vehicle.is_permanent == True),
+            _count_if(Vehicle.is_permanent == False),
+            _count_if(Vehicle.status == 'active')
+        ))
+
+        return {
+            'total': row[0],
+            'permanent': row[1],
+            'temporary': row[2],
+            'active': row[3]
+        }
+
+    def camera_counts(self):
+        """Count cameras by status"""
+        row = _counts(db.session.query(
+            func.count(Camera.id),
+            _count_if(Camera.status == 'online'),
+            _count_if(Camera.status == 'offline'),
+            _count_if(Camera.status == 'error')
+        ))
+
+        return {
+            'total': row[0],
+            'online': row[1],
+            'offline': row[2],
+            'error': row[3]
+        }
+
+    def gate_counts(self):
+        """Count gates by connectivity and position"""
+        row = _counts(db.session.query(
+            func.count(Gate.id),
+            _count_if(Gate.is_online == True),
+            _count_if(Gate.status == 'open')
+        ))
+
+        return {
+            'total': row[0],
+            'online': row[1],
+            'offline': row[0] - row[1],   # never-probed gates (NULL) count as offline
+            'open': row[2]
+        }
+
+    def access_counts(self, since):
+        """Count access logs since a time by event type and manual overrides"""
+        row = _counts(db.session.query(
+            _count_if(AccessLog.event_type == 'entry'),
+            _count_if(AccessLog.event_type == 'exit'),
+            _count_if(AccessLog.access_method == 'manual')
+        ).filter(
+            AccessLog.timestamp >= since
+        ))
+
+        return {
+            'entries': row[0],
+            'exits': row[1],
+            'manual_overrides': row[2]
+        }
+
+# Global dashboard stats instance
+dashboard_stats = DashboardStats()
@@ -0,0 +1,232 @@
+"""
+Device HTTP Service
+Pooled keep-alive HTTP sessions and circuit breakers for cameras and
+gate controllers
+"""
+
+import os
+import re
+import threading
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase, HTTPBasicAuth, HTTPDigestAuth
+from requests.cookies import extract_cookies_to_jar
+from requests.utils import parse_dict_header
+from app.services.circuit_breaker import CircuitBreaker
+
+class SharedDigestAuth(AuthBase):
+    """HTTP Digest auth whose server challenge is shared by every thread
+
+    requests' HTTPDigestAuth keeps the nonce in thread-local state, and
+    Flask serves each request on a new thread, so nearly every call took a
+    401 round trip. Here realm, nonce and nonce count are kept per host
+    under a lock: only the first call (or one after the device rotates its
+    nonce) is challenged.
+    """
+
+    def __init__(self, username, password):
+        # Computes the headers; its per-thread state is swapped for one
+        # shared namespace that is only touched under self._lock
+        self._digest = HTTPDigestAuth(username, password)
+        self._digest._thread_local = SimpleNamespace()
+        self._digest.init_per_thread_state()
+        self._lock = threading.Lock()
+        self.challenges = 0
+
+    def __call__(self, r):
+        with self._lock:
+            if self._digest._thread_local.chal:
+                r.headers['Authorization'] = self._digest.build_digest_header(r.method, r.url)
+
+        tell = getattr(r.body, 'tell', None)
+        position = tell() if tell else None
+        r.register_hook('response', lambda response, **kwargs: self._handle_401(response, position, **kwargs))
+        return r
+
+    def _handle_401(self, r, position, **kwargs):
+        """Answer a Digest challenge once and remember it for later calls"""
+        challenge = r.headers.get('www-authenticate', '')
+        if r.status_code != 401 or 'digest' not in challenge.lower():
+            return r
+
+        if position is not None:
+            r.request.body.seek(position)
+
+        with self._lock:
+            self.challenges += 1
+            self._digest._thread_local.chal = parse_dict_header(
+                re.sub(r'digest ', '', challenge, count=1, flags=re.IGNORECASE)
+            )
+            header = self._digest.build_digest_header(r.request.method, r.request.url)
+
+        # Release the connection so the retry can reuse it
+        r.content
+        r.close()
+        prep = r.request.copy()
+        extract_cookies_to_jar(prep._cookies, r.request, r.raw)
+        prep.prepare_cookies(prep._cookies)
+        prep.headers['Authorization'] = header
+
+        retried = r.connection.send(prep, **kwargs)
+        retried.history.append(r)
+        retried.request = prep
+        return retried
+
+class DeviceHttpPool:
+    def __init__(self):
+        self.max_connections = int(os.getenv('DEVICE_HTTP_MAX_CONNECTIONS', 4))
+        self.default_auth_scheme = os.getenv('DEVICE_AUTH_SCHEME', 'digest').lower()
+        self._sessions = {}   # host -> (session, adapter)
+        self._auth = {}       # (host, username, password) -> auth object
+        self._schemes = {}    # host -> auth scheme the device accepted
+        self._stats = {}      # host -> request/error counters
+        self._breakers = {}   # host -> CircuitBreaker
+        self.breaker_failures = int(os.getenv('DEVICE_BREAKER_FAILURES', 3))
+        self.breaker_reset_timeout = float(os.getenv('DEVICE_BREAKER_RESET_TIMEOUT', 30))
+        self._lock = threading.Lock()
+
+    def get(self, url, username=None, password=None, **kwargs):
+        """Send a GET request to a device"""
+        return self.request('GET', url, username, password, **kwargs)
+
+    def request(self, method, url, username=None, password=None, **kwargs):
+        """Send a request over the device's pooled session
+
+        Raises CircuitOpenError (a ConnectionError) without touching the
+        network while the device's circuit breaker is open.
+        """
+        host = self._host_key(url)
+        session = self._get_session(host)
+        stats = self._stats[host]
+        breaker = self._breakers[host]
+
+        breaker.before_request()
+
+        if username and password:
+            kwargs['auth'] = self._get_auth(host, username, password)
+
+        stats['requests'] += 1
+        try:
+            response = session.request(method, url, **kwargs)
+
+            # Fall back to Basic auth once for devices that do not offer Digest
+            if (response.status_code == 401 and username and password
+                    and self._schemes.get(host) != 'basic'
+                    and 'basic' in response.headers.get('WWW-Authenticate', '').lower()
+                    and 'digest' not in response.headers.get('WWW-Authenticate', '').lower()):
+                self._schemes[host] = 'basic'
+                kwargs['auth'] = self._get_auth(host, username, password)
+                stats['requests'] += 1
+                response = session.request(method, url, **kwargs)
+
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            stats['errors'] += 1
+            breaker.record_failure(e)
+            raise
+        except requests.exceptions.RequestException:
+            # The device answered (or was never contacted); not an outage
+            stats['errors'] += 1
+            breaker.record_success()
+            raise
+
+        breaker.record_success()
+        return response
+
+    def get_breakers(self):
+        """Get the circuit breaker state of every device host"""
+        return [self._breakers[host].get_state() for host in sorted(list(self._breakers))]
+
+    def reset_breaker(self, host):
+        """Close a device's circuit breaker; returns False for unknown hosts"""
+        breaker = self._breakers.get(host)
+        if not breaker:
+            return False
+        breaker.reset()
+        return True
+
+    def get_stats(self):
+        """Get per-host request and connection reuse statistics"""
+        hosts = []
+        for host, (_, adapter) in list(self._sessions.items()):
+            stats = self._stats[host]
+            connections = 0
+            pool_requests = 0
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    pool_requests += pool.num_requests
+
+            hosts.append({
+                'host': host,
+                'auth_scheme': self._schemes.get(host, self.default_auth_scheme),
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'connections_opened': connections,
+                'connections_reused': max(pool_requests - connections, 0),
+                'breaker': self._breakers[host].state
+            })
+
+        return {
+            'max_connections_per_host': self.max_connections,
+            'hosts': hosts,
+            'total': len(hosts)
+        }
+
+    def close(self):
+        """Close every pooled session"""
+        with self._lock:
+            for session, _ in self._sessions.values():
+                session.close()
+            self._sessions = {}
+            self._auth = {}
+
+    def _host_key(self, url):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        return f"{parts.hostname}:{port}"
+
+    def _get_session(self, host):
+        entry = self._sessions.get(host)
+        if entry:
+            return entry[0]
+
+        with self._lock:
+            entry = self._sessions.get(host)
+            if entry:
+                return entry[0]
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=self.max_connections,
+                pool_block=True,
+                max_retries=0
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._stats.setdefault(host, {'requests': 0, 'errors': 0})
+            self._breakers.setdefault(host, CircuitBreaker(
+                host, self.breaker_failures, self.breaker_reset_timeout
+            ))
+            self._sessions[host] = (session, adapter)
+            return session
+
+    def _get_auth(self, host, username, password):
+        scheme = self._schemes.get(host, self.default_auth_scheme)
+        key = (host, scheme, username, password)
+        auth = self._auth.get(key)
+        if auth is None:
+            # Digest auth objects share the server nonce between threads
+            if scheme == 'digest':
+                auth = SharedDigestAuth(username, password)
+            else:
+                auth = HTTPBasicAuth(username, password)
+            self._auth[key] = auth
+        return auth
+
+# Global device HTTP pool instance
+device_http = DeviceHttpPool()
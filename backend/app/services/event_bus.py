@@ -0,0 +1,138 @@
+"""
+Event Bus
+In-process publish/subscribe for live gate, camera, access and command
+updates, streamed to browsers as Server-Sent Events
+
+Published events get increasing ids and are kept in a ring so a client
+that reconnects with Last-Event-ID receives what it missed. A client that
+falls further behind than the ring (or its own buffer) gets a resync event
+and should reload full state.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+
+TOPICS = ('gate', 'camera', 'access', 'command')
+
+ACCESS_FIELDS = (
+    'event_id', 'vehicle_id', 'camera_id', 'gate_id', 'license_plate', 'event_type',
+    'access_method', 'confidence_score', 'operator_name', 'timestamp'
+)
+
+def access_event(row):
+    """The part of an access log row published on the access topic"""
+    return {field: row.get(field) for field in ACCESS_FIELDS}
+
+def _jsonable(data):
+    return {
+        key: value.isoformat() if isinstance(value, (datetime, date)) else value
+        for key, value in data.items()
+    }
+
+class Subscription:
+    """One connected client: its topics and a bounded event buffer"""
+
+    def __init__(self, topics, buffer_size):
+        self.topics = set(topics)
+        self.buffer_size = buffer_size
+        self.resync_id = None       # set when the buffer overflowed
+        self._events = deque()
+        self._cond = threading.Condition()
+
+    def push(self, event):
+        """Buffer an event; returns False if the buffer overflowed"""
+        with self._cond:
+            if len(self._events) >= self.buffer_size:
+                # Too slow to keep up: drop the backlog and ask for a resync
+                self._events.clear()
+                self.resync_id = event['id']
+                self._cond.notify()
+                return False
+            self._events.append(event)
+            self._cond.notify()
+            return True
+
+    def wait(self, timeout):
+        """Wait for events; returns (events, resync_id)"""
+        with self._cond:
+            if not self._events and self.resync_id is None:
+                self._cond.wait(timeout)
+            events, self._events = list(self._events), deque()
+            resync_id, self.resync_id = self.resync_id, None
+            return events, resync_id
+
+class EventBus:
+    def __init__(self):
+        self.ring_size = int(os.getenv('EVENT_BUS_RING_SIZE', 1000))
+        self.buffer_size = int(os.getenv('EVENT_STREAM_CLIENT_BUFFER', 200))
+        self.max_clients = int(os.getenv('EVENT_STREAM_MAX_CLIENTS', 50))
+        self.keepalive = float(os.getenv('EVENT_STREAM_KEEPALIVE', 15))
+        self._ring = deque(maxlen=self.ring_size)
+        # Ids start at the boot time in ms, so ids from before a restart
+        # fall outside the ring and those clients resync
+        self._last_id = int(time.time() * 1000)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.overflows = 0
+
+    def publish(self, topic, data):
+        """Publish an event to every subscriber of the topic"""
+        with self._lock:
+            self._last_id += 1
+            event = {'id': self._last_id, 'topic': topic, 'data': _jsonable(data)}
+            self._ring.append(event)
+            self.published += 1
+            for subscription in self._subscribers:
+                if topic in subscription.topics and not subscription.push(event):
+                    self.overflows += 1
+            return event['id']
+
+    def subscribe(self, topics, last_event_id=None):
+        """Register a client; returns (subscription, missed events, resync_id)
+
+        resync_id is set when events after last_event_id are no longer in
+        the ring, or None. subscription is None when the client limit is
+        reached.
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None, [], None
+
+            missed, resync_id = [], None
+            if last_event_id is not None:
+                oldest = self._ring[0]['id'] if self._ring else self._last_id + 1
+                if last_event_id + 1 < oldest or last_event_id > self._last_id:
+                    resync_id = self._last_id
+                else:
+                    missed = [
+                        event for event in self._ring
+                        if event['id'] > last_event_id and event['topic'] in topics
+                    ]
+
+            subscription = Subscription(topics, self.buffer_size)
+            self._subscribers.add(subscription)
+            return subscription, missed, resync_id
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def get_stats(self):
+        """Get subscriber count and event counters"""
+        with self._lock:
+            return {
+                'clients': len(self._subscribers),
+                'max_clients': self.max_clients,
+                'last_event_id': self._last_id,
+                'ring_events': len(self._ring),
+                'ring_size': self.ring_size,
+                'published': self.published,
+                'overflows': self.overflows
+            }
+
+# Global event bus instance
+event_bus = EventBus()
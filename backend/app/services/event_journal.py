@@ -0,0 +1,271 @@
+"""
+Event Journal
+Local append-only journal of access events, replayed into the database
+after an outage
+
+Every access log row is appended here (one JSON line) before it is handed
+to the database, and so is every later change to a row (an amendment,
+e.g. a better read of the same car). A record stays outstanding until it
+is committed; the checkpoint file stores the offset below which nothing is
+outstanding, so a restart or a database outage replays only the tail.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+DATETIME_FIELDS = ('timestamp', 'created_at')
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Unserializable journal value: {value!r}')
+
+def decode_row(record):
+    """Turn a journal record back into AccessLog column values"""
+    row = dict(record['row'])
+    for field in DATETIME_FIELDS:
+        if row.get(field):
+            row[field] = datetime.fromisoformat(row[field])
+    return row
+
+class EventJournal:
+    def __init__(self):
+        self.enabled = os.getenv('ACCESS_JOURNAL_ENABLED', 'True').lower() == 'true'
+        self.fsync_interval = float(os.getenv('ACCESS_JOURNAL_FSYNC_INTERVAL', 0.1))
+        self.max_bytes = int(os.getenv('ACCESS_JOURNAL_MAX_BYTES', 64 * 1024 * 1024))
+        self.path = None
+        self._file = None
+        self._end = 0               # byte offset after the last appended record
+        self._synced = 0            # byte offset known to be on disk
+        self._checkpoint = 0        # nothing before this offset is outstanding
+        self._outstanding = {}      # record start offset -> end offset
+        self._unreplayed = None     # (start, end) left over from the last run
+        self._lock = threading.Lock()
+        self._sync_thread = None
+        self.appended = 0
+        self.fsyncs = 0
+        self.replayed = 0
+        self.replay_needed = False
+        self.last_replay_at = None
+
+    def open(self, directory):
+        """Open (or recover) the journal in a directory once per process"""
+        with self._lock:
+            if not self.enabled or self._file:
+                return False
+
+            os.makedirs(directory, exist_ok=True)
+            self.path = os.path.join(directory, 'access-journal.jsonl')
+            self._checkpoint_path = self.path + '.checkpoint'
+
+            self._file = open(self.path, 'ab+')
+            self._truncate_torn_tail()
+            self._end = self._synced = self._file.seek(0, os.SEEK_END)
+            self._checkpoint = min(self._read_checkpoint(), self._end)
+            if self._checkpoint < self._end:
+                self._unreplayed = (self._checkpoint, self._end)
+                self.replay_needed = True
+
+            self._sync_thread = threading.Thread(target=self._sync_loop, name='access-journal', daemon=True)
+            self._sync_thread.start()
+            return True
+
+    def is_open(self):
+        return self._file is not None
+
+    def append(self, row):
+        """Append one row; returns the record offset (None when disabled)
+
+        The write reaches the OS immediately; fsync is batched by the
+        sync thread so callers never wait on the disk.
+        """
+        return self._append({'event_id': row['event_id'], 'row': row})
+
+    def append_amendment(self, event_id, fields):
+        """Append a change to an earlier row; returns the record offset (None when disabled)"""
+        return self._append({'event_id': event_id, 'amend': fields})
+
+    def commit(self, offsets):
+        """Mark records as stored in the database and advance the checkpoint"""
+        with self._lock:
+            for offset in offsets:
+                if offset is not None:
+                    self._outstanding.pop(offset, None)
+            self._advance_checkpoint()
+
+    def read_pending(self, limit=500):
+        """Yield (records, next_offset) chunks from the checkpoint to the end
+
+        records is a list of (offset, record); unreadable lines come back
+        as None records so they are skipped but still committed.
+        """
+        with self._lock:
+            if not self._file:
+                return
+            start, end = self._checkpoint, self._end
+
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            batch = []
+            offset = start
+            while offset < end:
+                line = f.readline()
+                if not line:
+                    break
+                record_offset, offset = offset, offset + len(line)
+                try:
+                    batch.append((record_offset, json.loads(line)))
+                except ValueError:
+                    print(f"Skipping unreadable journal record at offset {record_offset}")
+                    batch.append((record_offset, None))
+                if len(batch) >= limit:
+                    yield batch, offset
+                    batch = []
+            if batch:
+                yield batch, offset
+
+    def mark_replayed(self, records, next_offset, count):
+        """Record a replayed chunk as stored in the database"""
+        with self._lock:
+            self.replayed += count
+            self.last_replay_at = datetime.utcnow()
+            for offset, _ in records:
+                self._outstanding.pop(offset, None)
+            if self._unreplayed:
+                start, end = self._unreplayed
+                self._unreplayed = (next_offset, end) if next_offset < end else None
+            self._advance_checkpoint()
+
+    def finish_replay(self):
+        """Clear the replay flag once the left-over tail is stored"""
+        with self._lock:
+            self.replay_needed = bool(self._unreplayed)
+
+    def request_replay(self):
+        """Ask for a replay after a failed database write
+
+        Returns False (and does nothing) when the journal is not open.
+        """
+        with self._lock:
+            if not self._file:
+                return False
+            self.replay_needed = True
+            return True
+
+    def get_stats(self):
+        """Get journal size, checkpoint and counters"""
+        with self._lock:
+            return {
+                'enabled': self.enabled and self._file is not None,
+                'path': self.path,
+                'size_bytes': self._end,
+                'synced_bytes': self._synced,
+                'checkpoint': self._checkpoint,
+                'outstanding': len(self._outstanding),
+                'pending_bytes': self._end - self._checkpoint,
+                'appended': self.appended,
+                'fsyncs': self.fsyncs,
+                'replayed': self.replayed,
+                'replay_needed': self.replay_needed,
+                'last_replay_at': self.last_replay_at.isoformat() if self.last_replay_at else None
+            }
+
+    def sync(self):
+        """fsync everything appended so far"""
+        with self._lock:
+            if not self._file or self._synced == self._end:
+                return
+            end = self._end
+            fd = self._file.fileno()
+
+        os.fsync(fd)
+        with self._lock:
+            self._synced = max(self._synced, end)
+            self.fsyncs += 1
+
+    def close(self):
+        self.sync()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _append(self, record):
+        if not self._file:
+            return None
+
+        line = json.dumps(record, default=_encode, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock:
+            start = self._end
+            self._file.write(line)
+            self._file.flush()
+            self._end += len(line)
+            self._outstanding[start] = self._end
+            self.appended += 1
+            return start
+
+    def _sync_loop(self):
+        while self._file:
+            time.sleep(self.fsync_interval)
+            try:
+                self.sync()
+            except (OSError, ValueError) as e:
+                print(f"Access journal fsync failed: {e}")
+
+    def _advance_checkpoint(self):
+        candidates = [min(self._outstanding)] if self._outstanding else []
+        if self._unreplayed:
+            candidates.append(self._unreplayed[0])
+        checkpoint = min(candidates) if candidates else self._end
+        if checkpoint <= self._checkpoint:
+            return
+
+        self._checkpoint = checkpoint
+        if checkpoint == self._end and self._end >= self.max_bytes:
+            # Everything is in the database: start the journal over
+            self._file.truncate(0)
+            self._file.seek(0)
+            os.fsync(self._file.fileno())
+            self._end = self._synced = self._checkpoint = 0
+
+        self._write_checkpoint()
+
+    def _read_checkpoint(self):
+        try:
+            with open(self._checkpoint_path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_checkpoint(self):
+        temp_path = self._checkpoint_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(str(self._checkpoint))
+        os.replace(temp_path, self._checkpoint_path)
+
+    def _truncate_torn_tail(self):
+        """Drop a partial last line left by a crash mid-write"""
+        size = self._file.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            self._file.seek(position - step)
+            chunk = self._file.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+
+        if position != size:
+            print(f"Truncating torn access journal tail ({size - position} bytes)")
+            self._file.truncate(position)
+
+# Global event journal instance
+event_journal = EventJournal()
@@ -0,0 +1,159 @@
+"""
+Frame Grabber Service
+One long-lived RTSP decoder per camera feeding a bounded ring buffer
+
+Decoded frames are raw BGR arrays (about 6 MB each at 1080p), so by
+default only the latest frame is kept and the buffer is also capped by
+bytes.
+"""
+
+import threading
+import time
+from collections import deque
+import cv2
+
+class Frame:
+    __slots__ = ('seq', 'timestamp', 'image', '_jpeg', '_lock')
+
+    def __init__(self, seq, image):
+        self.seq = seq
+        self.timestamp = time.time()
+        self.image = image
+        self._jpeg = None
+        self._lock = threading.Lock()
+
+    def jpeg(self, quality=80):
+        """JPEG-encode the frame once and share the bytes between viewers"""
+        if self._jpeg is None:
+            with self._lock:
+                if self._jpeg is None:
+                    ok, buffer = cv2.imencode('.jpg', self.image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                    self._jpeg = buffer.tobytes() if ok else b''
+        return self._jpeg
+
+class FrameGrabber:
+    def __init__(self, camera_id, rtsp_url, buffer_size=1, max_bytes=None, idle_timeout=30, on_idle=None):
+        self.camera_id = camera_id
+        self.rtsp_url = rtsp_url
+        self.idle_timeout = idle_timeout
+        self.frames = deque(maxlen=max(buffer_size, 1))
+        self.max_bytes = max_bytes
+        self.buffered_bytes = 0
+        self.refs = 0
+        self.seq = 0
+        self.connected = False
+        self.reconnects = 0
+        self.error = None
+        self.started_at = time.time()
+        self.stopped = threading.Event()
+        self._idle_since = time.monotonic()
+        self._condition = threading.Condition()
+        self._on_idle = on_idle
+
+    def run(self):
+        """Decode frames until stopped or idle (runs in its own thread)"""
+        backoff = 1
+        while not self.stopped.is_set():
+            capture = cv2.VideoCapture(self.rtsp_url)
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+            if not capture.isOpened():
+                capture.release()
+                self.error = 'Cannot open RTSP stream'
+                if self._check_idle():
+                    break
+                self.stopped.wait(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+
+            self.connected = True
+            self.error = None
+            backoff = 1
+
+            while not self.stopped.is_set():
+                ret, image = capture.read()
+                if not ret:
+                    self.error = 'RTSP stream not readable'
+                    break
+                self._push(image)
+                if self._check_idle():
+                    break
+
+            capture.release()
+            self.connected = False
+            if not self.stopped.is_set():
+                self.reconnects += 1
+
+        # Wake any viewer still waiting on this grabber
+        with self._condition:
+            self._condition.notify_all()
+
+    def acquire(self):
+        """Register a consumer"""
+        with self._condition:
+            self.refs += 1
+
+    def release(self):
+        """Unregister a consumer; the decoder stops after idle_timeout"""
+        with self._condition:
+            self.refs = max(self.refs - 1, 0)
+            if self.refs == 0:
+                self._idle_since = time.monotonic()
+
+    def stop(self):
+        """Stop decoding"""
+        self.stopped.set()
+
+    def latest(self):
+        """Get the newest frame, or None"""
+        frames = self.frames
+        return frames[-1] if frames else None
+
+    def frames_since(self, seq):
+        """Get buffered frames newer than seq, oldest first"""
+        with self._condition:
+            return [frame for frame in self.frames if frame.seq > seq]
+
+    def wait_for_frame(self, after_seq=0, timeout=5):
+        """Block until a frame newer than after_seq is available"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.seq > after_seq or self.stopped.is_set(), timeout
+            )
+            return self.frames[-1] if self.seq > after_seq and self.frames else None
+
+    def get_stats(self):
+        """Get decoder status"""
+        latest = self.latest()
+        return {
+            'camera_id': self.camera_id,
+            'connected': self.connected,
+            'consumers': self.refs,
+            'frames_decoded': self.seq,
+            'buffered_frames': len(self.frames),
+            'buffered_bytes': self.buffered_bytes,
+            'reconnects': self.reconnects,
+            'last_frame_at': latest.timestamp if latest else None,
+            'error': self.error
+        }
+
+    def _push(self, image):
+        with self._condition:
+            self.seq += 1
+            if len(self.frames) == self.frames.maxlen:
+                self.buffered_bytes -= self.frames[0].image.nbytes
+            self.frames.append(Frame(self.seq, image))
+            self.buffered_bytes += image.nbytes
+
+            # Always keep the newest frame, whatever its size
+            while self.max_bytes and self.buffered_bytes > self.max_bytes and len(self.frames) > 1:
+                self.buffered_bytes -= self.frames.popleft().image.nbytes
+            self._condition.notify_all()
+
+    def _check_idle(self):
+        if self.refs or time.monotonic() - self._idle_since < self.idle_timeout:
+            return False
+        if self._on_idle is None or self._on_idle(self):
+            self.stopped.set()
+            return True
+        return False
@@ -0,0 +1,191 @@
+"""
+Gate Dispatcher Service
+Run gate commands off the request thread, one ordered queue per gate
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.services.event_bus import event_bus
+from app.services.gate_service import gate_service
+
+ACTIONS = ('open', 'close')
+
+class GateDispatcher:
+    def __init__(self):
+        self.max_workers = int(os.getenv('GATE_DISPATCH_WORKERS', 8))
+        self.history_size = int(os.getenv('GATE_COMMAND_HISTORY', 500))
+        self.commands = OrderedDict()   # command id -> command, oldest first
+        self._queues = {}               # gate id -> deque of queued commands
+        self._running = {}              # gate id -> command being sent
+        self._active = set()            # gate ids with a worker draining them
+        self._sends = {}                # command id -> gate ref, timeout and callbacks
+        self._executor = None
+        self._app = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+
+    def start(self, app):
+        """Bind the application and create the worker pool once"""
+        with self._lock:
+            if self._executor:
+                return False
+
+            self._app = app
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='gate-command'
+            )
+            return True
+
+    def submit(self, gate_id, action, operator_name=None, reason=None,
+               gate=None, timeout=None, on_done=None):
+        """Queue a command and return it without waiting for the controller
+
+        A command identical to the one waiting at the back of the gate's
+        queue (or to the one being sent, when nothing is waiting) is
+        coalesced into it and the existing command is returned.
+
+        Automatic ANPR opens pass the in-memory gate ref as gate: the
+        command goes straight to the controller, without loading the gate
+        or logging a manual access. on_done(result, sent_at) runs when the
+        command (or the one it was coalesced into) finishes; sent_at is
+        the time.monotonic() the controller was contacted.
+        """
+        if action not in ACTIONS:
+            raise ValueError(f'Unsupported gate action: {action}')
+
+        source = 'anpr' if gate else 'manual'
+        with self._lock:
+            self.submitted += 1
+            waiting = self._queues.setdefault(gate_id, deque())
+            running = self._running.get(gate_id)
+
+            previous = waiting[-1] if waiting else running
+            if previous and previous['action'] == action and previous['source'] == source:
+                previous['coalesced'] += 1
+                self.coalesced += 1
+                if on_done:
+                    self._sends.setdefault(previous['id'], {}).setdefault('callbacks', []).append(on_done)
+                return dict(previous)
+
+            command = {
+                'id': uuid.uuid4().hex,
+                'gate_id': gate_id,
+                'action': action,
+                'source': source,
+                'status': 'queued',
+                'coalesced': 0,
+                'operator_name': operator_name,
+                'reason': reason,
+                'created_at': datetime.utcnow().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self.commands[command['id']] = command
+            self._trim_history()
+            waiting.append(command)
+            if gate or on_done:
+                self._sends[command['id']] = {
+                    'gate': gate,
+                    'timeout': timeout,
+                    'callbacks': [on_done] if on_done else []
+                }
+
+            if gate_id not in self._active:
+                self._active.add(gate_id)
+                self._executor.submit(self._run_gate, gate_id)
+
+            return dict(command)
+
+    def get_command(self, command_id):
+        """Get a snapshot of a command, or None"""
+        with self._lock:
+            command = self.commands.get(command_id)
+            return dict(command) if command else None
+
+    def get_stats(self):
+        """Get queue depths per gate and dispatcher counters"""
+        with self._lock:
+            gates = [
+                {
+                    'gate_id': gate_id,
+                    'queued': len(waiting),
+                    'running': self._running[gate_id]['id'] if gate_id in self._running else None
+                }
+                for gate_id, waiting in sorted(self._queues.items())
+                if waiting or gate_id in self._running
+            ]
+
+            return {
+                'running': self._executor is not None,
+                'workers': self.max_workers,
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'tracked_commands': len(self.commands),
+                'gates': gates
+            }
+
+    def _run_gate(self, gate_id):
+        """Send a gate's queued commands in order"""
+        while True:
+            with self._lock:
+                waiting = self._queues[gate_id]
+                if not waiting:
+                    self._active.discard(gate_id)
+                    return
+
+                command = waiting.popleft()
+                command['status'] = 'running'
+                command['started_at'] = datetime.utcnow().isoformat()
+                self._running[gate_id] = command
+                send = self._sends.get(command['id'], {})
+
+            sent_at = time.monotonic()
+            try:
+                with self._app.app_context():
+                    if send.get('gate'):
+                        result = gate_service.send(send['gate'], command['action'], send['timeout'])
+                    elif command['action'] == 'open':
+                        result = gate_service.open_gate(
+                            gate_id, command['operator_name'], command['reason']
+                        )
+                    else:
+                        result = gate_service.close_gate(gate_id, command['operator_name'])
+            except Exception as e:
+                result = {'success': False, 'error': f'Gate dispatcher error: {str(e)}'}
+
+            with self._lock:
+                command['status'] = 'succeeded' if result['success'] else 'failed'
+                command['result'] = result
+                command['error'] = result.get('error')
+                command['finished_at'] = datetime.utcnow().isoformat()
+                del self._running[gate_id]
+                finished = dict(command)
+                callbacks = self._sends.pop(command['id'], {}).get('callbacks', [])
+            event_bus.publish('command', finished)
+
+            for callback in callbacks:
+                try:
+                    callback(result, sent_at)
+                except Exception as e:
+                    print(f"Gate command callback failed: {e}")
+
+    def _trim_history(self):
+        """Forget the oldest finished commands beyond the history size"""
+        excess = len(self.commands) - self.history_size
+        for command_id in list(self.commands):
+            if excess <= 0:
+                break
+            if self.commands[command_id]['status'] in ('succeeded', 'failed'):
+                del self.commands[command_id]
+                excess -= 1
+
+# Global gate dispatcher instance
+gate_dispatcher = GateDispatcher()
@@ -0,0 +1,367 @@
+"""
+Gate Drivers
+Pluggable transports for gate controllers (HTTP, persistent TCP, relay boards)
+
+TCP and relay controllers speak a line protocol over one persistent socket
+per controller. Frames are tagged so several commands can be in flight at
+once and replies may be matched out of order:
+
+    request:  <id> <COMMAND> [ARGS]\\n
+    reply:    <id> OK [STATE]\\n   or   <id> ERR <MESSAGE>\\n
+"""
+
+import itertools
+import os
+import socket
+import threading
+import time
+from collections import deque
+import requests
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.device_http import device_http
+
+ACTIONS = ('open', 'close', 'status')
+
+class GateCommandError(Exception):
+    """The controller was reached but rejected the command"""
+
+def control_target(gate):
+    """Copy the fields a driver needs so worker threads never touch the session"""
+    return {
+        'control_method': gate.control_method or 'http',
+        'host': gate.controller_ip,
+        'port': gate.controller_port,
+        'open_command': gate.open_command,
+        'close_command': gate.close_command,
+        'urls': {action: gate.get_control_url(action) for action in ACTIONS}
+    }
+
+def gate_ref(gate):
+    """Copy a gate's identity, stored state and control target off the session"""
+    return {
+        'id': gate.id,
+        'name': gate.name,
+        'camera_id': gate.camera_id,
+        'status': gate.status,
+        'is_online': gate.is_online,
+        'target': control_target(gate)
+    }
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    return round(ordered[min(int(pct / 100.0 * len(ordered)), len(ordered) - 1)], 1)
+
+class GateDriver:
+    """Base driver: times every command and keeps round-trip statistics"""
+
+    name = None
+
+    def __init__(self):
+        self.commands = 0
+        self.failures = 0
+        self._rtt = deque(maxlen=500)
+        self._lock = threading.Lock()
+
+    def send(self, target, action, timeout):
+        """Send open/close/status; returns a result dict, never raises
+
+        reachable tells a rejected command (controller answered) apart
+        from a controller that could not be reached at all.
+        """
+        started = time.perf_counter()
+        try:
+            state = self._send(target, action, timeout)
+            result = {'success': True, 'reachable': True, 'state': state}
+        except GateCommandError as e:
+            result = {'success': False, 'reachable': True, 'error': f'Gate controller error: {str(e)}'}
+        except (OSError, requests.exceptions.RequestException) as e:
+            result = {'success': False, 'reachable': False,
+                      'error': f'Gate controller connection failed: {str(e)}'}
+
+        rtt_ms = (time.perf_counter() - started) * 1000
+        result['rtt_ms'] = round(rtt_ms, 1)
+
+        with self._lock:
+            self.commands += 1
+            if result['success']:
+                self._rtt.append(rtt_ms)
+            else:
+                self.failures += 1
+        return result
+
+    def get_stats(self):
+        with self._lock:
+            ordered = sorted(self._rtt)
+            return {
+                'commands': self.commands,
+                'failures': self.failures,
+                'rtt_p50_ms': _percentile(ordered, 50),
+                'rtt_p95_ms': _percentile(ordered, 95),
+                'rtt_max_ms': round(ordered[-1], 1) if ordered else None
+            }
+
+    def _send(self, target, action, timeout):
+        raise NotImplementedError
+
+class HttpGateDriver(GateDriver):
+    """One GET per command through the shared device HTTP pool"""
+
+    name = 'http'
+
+    def _send(self, target, action, timeout):
+        response = device_http.get(target['urls'][action], timeout=timeout)
+        if action == 'status':
+            # Any HTTP answer means the controller itself is reachable
+            return f'http_{response.status_code}'
+        if response.status_code != 200:
+            raise GateCommandError(f'HTTP {response.status_code}')
+        return 'open' if action == 'open' else 'closed'
+
+class TcpConnection:
+    """Persistent, pipelined connection to one controller"""
+
+    def __init__(self, host, port, connect_timeout, breaker):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.breaker = breaker
+        self.connects = 0
+        self._sock = None
+        self._pending = {}          # frame id -> reply slot
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def call(self, frame, timeout):
+        """Send one frame and wait for its reply; returns the reply text"""
+        self.breaker.before_request()
+
+        # A controller may drop an idle socket just as we write to it, so a
+        # frame lost on a reused connection is retried once on a fresh one
+        for attempt in range(2):
+            slot = {'event': threading.Event(), 'reply': None, 'error': None}
+            try:
+                reused = self._write(frame, slot)
+            except OSError as e:
+                self.breaker.record_failure(e)
+                raise
+
+            if not slot['event'].wait(timeout):
+                self._drop(slot)
+                self._close(f'no reply within {timeout}s')
+                error = TimeoutError(f'No reply from {self.host}:{self.port} within {timeout}s')
+                self.breaker.record_failure(error)
+                raise error
+
+            if slot['error'] is None:
+                self.breaker.record_success()
+                return slot['reply']
+            if not reused or attempt:
+                error = ConnectionError(slot['error'])
+                self.breaker.record_failure(error)
+                raise error
+
+    def is_connected(self):
+        return self._sock is not None
+
+    def pending(self):
+        return len(self._pending)
+
+    def close(self):
+        self._close('connection closed')
+
+    def _write(self, frame, slot):
+        with self._lock:
+            reused = self._sock is not None
+            if not reused:
+                self._connect()
+
+            frame_id = next(self._ids)
+            slot['id'] = frame_id
+            self._pending[frame_id] = slot
+            try:
+                self._sock.sendall(f'{frame_id} {frame}\n'.encode('utf-8'))
+            except OSError:
+                self._pending.pop(frame_id, None)
+                self._close_locked('write failed')
+                raise
+            return reused
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._sock = sock
+        self.connects += 1
+        threading.Thread(
+            target=self._read, args=(sock,),
+            name=f'gate-tcp-{self.host}:{self.port}', daemon=True
+        ).start()
+
+    def _read(self, sock):
+        buffer = b''
+        try:
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    self._resolve(line.decode('utf-8', 'replace').strip())
+        except OSError:
+            pass
+
+        with self._lock:
+            if self._sock is sock:
+                self._close_locked('connection closed by controller')
+
+    def _resolve(self, line):
+        parts = line.split(' ', 2)
+        if len(parts) < 2 or not parts[0].isdigit():
+            return
+
+        slot = self._pending.pop(int(parts[0]), None)
+        if slot is None:
+            return  # reply to a frame that already timed out
+
+        detail = parts[2] if len(parts) > 2 else ''
+        if parts[1].upper() == 'OK':
+            slot['reply'] = detail
+        else:
+            slot['reply'] = GateCommandError(detail or parts[1])
+        slot['event'].set()
+
+    def _drop(self, slot):
+        with self._lock:
+            self._pending.pop(slot.get('id'), None)
+
+    def _close(self, reason):
+        with self._lock:
+            self._close_locked(reason)
+
+    def _close_locked(self, reason):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+        # Fail every frame still waiting on this socket
+        for slot in self._pending.values():
+            slot['error'] = f'{self.host}:{self.port} {reason}'
+            slot['event'].set()
+        self._pending = {}
+
+class TcpGateDriver(GateDriver):
+    """OPEN / CLOSE / STATUS frames over a persistent socket per controller"""
+
+    name = 'tcp'
+
+    def __init__(self):
+        super().__init__()
+        self.connect_timeout = float(os.getenv('GATE_TCP_CONNECT_TIMEOUT', 2))
+        self._connections = {}   # (host, port) -> TcpConnection
+        self._connections_lock = threading.Lock()
+
+    def frame(self, target, action):
+        """Build the command frame for an action"""
+        if action == 'open':
+            return target['open_command'] or 'OPEN'
+        if action == 'close':
+            return target['close_command'] or 'CLOSE'
+        return 'STATUS'
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['connections'] = [
+            {
+                'controller': f'{host}:{port}',
+                'connected': connection.is_connected(),
+                'in_flight': connection.pending(),
+                'connects': connection.connects,
+                'breaker': connection.breaker.state
+            }
+            for (host, port), connection in sorted(list(self._connections.items()))
+        ]
+        return stats
+
+    def close(self):
+        """Close every controller socket"""
+        for connection in list(self._connections.values()):
+            connection.close()
+
+    def _send(self, target, action, timeout):
+        connection = self._get_connection(target['host'], int(target['port']))
+        reply = connection.call(self.frame(target, action), timeout)
+        if isinstance(reply, GateCommandError):
+            raise reply
+        if reply:
+            return reply.split()[0].lower()
+        return {'open': 'open', 'close': 'closed'}.get(action)
+
+    def _get_connection(self, host, port):
+        key = (host, port)
+        connection = self._connections.get(key)
+        if connection:
+            return connection
+
+        with self._connections_lock:
+            connection = self._connections.get(key)
+            if connection is None:
+                breaker = CircuitBreaker(
+                    f'{host}:{port}', device_http.breaker_failures, device_http.breaker_reset_timeout
+                )
+                connection = TcpConnection(host, port, self.connect_timeout, breaker)
+                self._connections[key] = connection
+            return connection
+
+class RelayGateDriver(TcpGateDriver):
+    """Network relay boards: pulse one relay channel to open, another to close
+
+    open_command / close_command hold the channel numbers (default 1 and 2).
+    """
+
+    name = 'relay'
+
+    def frame(self, target, action):
+        if action == 'open':
+            return f"PULSE {target['open_command'] or 1}"
+        if action == 'close':
+            return f"PULSE {target['close_command'] or 2}"
+        return 'STATUS'
+
+class GateDrivers:
+    def __init__(self):
+        self.drivers = {}
+
+    def register(self, driver):
+        """Register a driver under its control_method name"""
+        self.drivers[driver.name] = driver
+
+    def get(self, control_method):
+        driver = self.drivers.get(control_method or 'http')
+        if driver is None:
+            raise ValueError(f'Unsupported gate control method: {control_method}')
+        return driver
+
+    def send(self, target, action, timeout):
+        """Send a command through the driver for the gate's control method"""
+        return self.get(target['control_method']).send(target, action, timeout)
+
+    def get_stats(self):
+        """Get command counts and round-trip times per driver"""
+        return {name: driver.get_stats() for name, driver in self.drivers.items()}
+
+    def close(self):
+        for driver in self.drivers.values():
+            if hasattr(driver, 'close'):
+                driver.close()
+
+# Global gate drivers instance
+gate_drivers = GateDrivers()
+gate_drivers.register(HttpGateDriver())
+gate_drivers.register(TcpGateDriver())
+gate_drivers.register(RelayGateDriver())
@@ -3,15 +3,16 @@ Gate Service - MVP Version
 Handle gate control operations
 """
 
-import requests
+import os
 from datetime import datetime
-from app import db
 from app.models.gate import Gate
-from app.models.access_log import AccessLog
+from app.services.access_log_writer import access_log_writer
+from app.services.event_bus import event_bus
+from app.services.gate_drivers import gate_drivers, gate_ref
 
 class GateService:
     def __init__(self):
-        self.default_timeout = 10
+        self.default_timeout = float(os.getenv('DEFAULT_GATE_TIMEOUT', 10))
     
     def open_gate(self, gate_id, operator_name=None, reason=None):
         """Open gate manually"""
@@ -20,55 +21,24 @@ class GateService:
             if not gate:
                 return {'success': False, 'error': 'Gate not found'}
             
-            # Get control URL
-            control_url = gate.get_control_url('open')
+            result = self.send_command(gate, 'open')
             
-            if not control_url:
-                # Simulate gate opening for MVP (no actual hardware)
-                gate.status = 'open'
-                gate.last_heartbeat = datetime.utcnow()
-                db.session.commit()
-                
-                # Log manual override
-                self._log_manual_access(gate_id, 'manual_open', operator_name, reason)
-                
-                return {
-                    'success': True,
-                    'message': 'Gate opened successfully (simulated)',
-                    'gate_status': 'open'
-                }
-            
-            # Send HTTP command to gate controller
-            try:
-                response = requests.get(control_url, timeout=self.default_timeout)
-                
-                if response.status_code == 200:
-                    gate.status = 'open'
-                    gate.is_online = True
-                    gate.last_heartbeat = datetime.utcnow()
-                    db.session.commit()
-                    
-                    # Log manual override
-                    self._log_manual_access(gate_id, 'manual_open', operator_name, reason)
-                    
-                    return {
-                        'success': True,
-                        'message': 'Gate opened successfully',
-                        'gate_status': 'open'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': f'Gate controller error: HTTP {response.status_code}'
-                    }
-                    
-            except requests.exceptions.RequestException as e:
-                gate.is_online = False
-                db.session.commit()
+            if not result['success']:
                 return {
                     'success': False,
-                    'error': f'Gate controller connection failed: {str(e)}'
+                    'error': result['error']
                 }
+            
+            # Log manual override
+            self._log_manual_access(gate_id, 'manual_open', operator_name, reason)
+            
+            return {
+                'success': True,
+                'message': ('Gate opened successfully (simulated)' if result['simulated']
+                            else 'Gate opened successfully'),
+                'gate_status': 'open',
+                'rtt_ms': result.get('rtt_ms')
+            }
                 
         except Exception as e:
             return {
@@ -83,49 +53,21 @@ class GateService:
             if not gate:
                 return {'success': False, 'error': 'Gate not found'}
             
-            # Get control URL
-            control_url = gate.get_control_url('close')
-            
-            if not control_url:
-                # Simulate gate closing for MVP (no actual hardware)
-                gate.status = 'closed'
-                gate.last_heartbeat = datetime.utcnow()
-                db.session.commit()
-                
-                return {
-                    'success': True,
-                    'message': 'Gate closed successfully (simulated)',
-                    'gate_status': 'closed'
-                }
+            result = self.send_command(gate, 'close')
             
-            # Send HTTP command to gate controller
-            try:
-                response = requests.get(control_url, timeout=self.default_timeout)
-                
-                if response.status_code == 200:
-                    gate.status = 'closed'
-                    gate.is_online = True
-                    gate.last_heartbeat = datetime.utcnow()
-                    db.session.commit()
-                    
-                    return {
-                        'success': True,
-                        'message': 'Gate closed successfully',
-                        'gate_status': 'closed'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': f'Gate controller error: HTTP {response.status_code}'
-                    }
-                    
-            except requests.exceptions.RequestException as e:
-                gate.is_online = False
-                db.session.commit()
+            if not result['success']:
                 return {
                     'success': False,
-                    'error': f'Gate controller connection failed: {str(e)}'
+                    'error': result['error']
                 }
+            
+            return {
+                'success': True,
+                'message': ('Gate closed successfully (simulated)' if result['simulated']
+                            else 'Gate closed successfully'),
+                'gate_status': 'closed',
+                'rtt_ms': result.get('rtt_ms')
+            }
                 
         except Exception as e:
             return {
@@ -133,6 +75,44 @@ class GateService:
                 'error': f'Gate service error: {str(e)}'
             }
     
+    def send_command(self, gate, action, timeout=None):
+        """Send an open/close command to a loaded gate"""
+        return self.send(gate_ref(gate), action, timeout)
+    
+    def send(self, ref, action, timeout=None):
+        """Send an open/close command to a gate ref (see gate_drivers.gate_ref)
+
+        The command goes through the driver for the gate's control method.
+        The resulting gate status is handed to the write-behind writer, so
+        the caller never waits on the database.
+        """
+        status = 'open' if action == 'open' else 'closed'
+        
+        if not ref['target']['host']:
+            # Simulate the gate for MVP (no actual hardware)
+            self._update_gate(ref, status=status, last_heartbeat=datetime.utcnow())
+            return {'success': True, 'gate_status': status, 'simulated': True}
+        
+        result = gate_drivers.send(ref['target'], action, timeout or self.default_timeout)
+        
+        if not result['reachable']:
+            self._update_gate(ref, is_online=False)
+            return result
+        
+        if not result['success']:
+            self._update_gate(ref, is_online=True)
+            return result
+        
+        self._update_gate(
+            ref, status=status, is_online=True, last_heartbeat=datetime.utcnow()
+        )
+        return {
+            'success': True,
+            'gate_status': status,
+            'simulated': False,
+            'rtt_ms': result['rtt_ms']
+        }
+    
     def get_gate_status(self, gate_id):
         """Get current gate status"""
         try:
@@ -142,7 +122,7 @@ class GateService:
             
             return {
                 'success': True,
-                'gate': gate.to_dict()
+                'gate': self._with_pending(gate.to_dict())
             }
             
         except Exception as e:
@@ -158,7 +138,7 @@ class GateService:
             gates_status = []
             
             for gate in gates:
-                gates_status.append(gate.to_dict())
+                gates_status.append(self.status_dict(gate))
             
             return {
                 'success': True,
@@ -172,24 +152,46 @@ class GateService:
                 'error': f'Status check error: {str(e)}'
             }
     
+    def _update_gate(self, ref, **fields):
+        """Buffer a gate status change and publish the fields that changed"""
+        current = {'status': ref['status'], 'is_online': ref['is_online']}
+        current.update(access_log_writer.pending_gate_updates().get(ref['id'], {}))
+        changed = {
+            field: value for field, value in fields.items()
+            if field in ('status', 'is_online') and current.get(field) != value
+        }
+        
+        access_log_writer.update_gate(ref['id'], **fields)
+        # Refs kept in memory (the plate index) follow the latest state
+        ref.update(changed)
+        if changed:
+            event_bus.publish('gate', dict(changed, gate_id=ref['id'], name=ref['name']))
+    
+    def status_dict(self, gate):
+        """Get a gate's fields including changes not stored yet"""
+        return self._with_pending(gate.to_dict())
+    
+    def _with_pending(self, gate_dict):
+        """Overlay status changes the write-behind writer has not stored yet"""
+        pending = access_log_writer.pending_gate_updates().get(gate_dict['id'])
+        if pending:
+            for field, value in pending.items():
+                gate_dict[field] = value.isoformat() if isinstance(value, datetime) else value
+        return gate_dict
+    
     def _log_manual_access(self, gate_id, event_type, operator_name, reason):
-        """Log manual gate operation"""
-        try:
-            access_log = AccessLog(
-                gate_id=gate_id,
-                license_plate='MANUAL',
-                event_type=event_type,
-                access_method='manual',
-                manual_reason=reason or 'Manual override',
-                operator_name=operator_name or 'Unknown',
-                timestamp=datetime.utcnow()
-            )
-            
-            db.session.add(access_log)
-            db.session.commit()
-            
-        except Exception as e:
-            print(f"Failed to log manual access: {e}")
+        """Log manual gate operation (written behind)"""
+        now = datetime.utcnow()
+        access_log_writer.add_access_log({
+            'gate_id': gate_id,
+            'license_plate': 'MANUAL',
+            'event_type': event_type,
+            'access_method': 'manual',
+            'manual_reason': reason or 'Manual override',
+            'operator_name': operator_name or 'Unknown',
+            'timestamp': now,
+            'created_at': now
+        })
 
 # Global gate service instance
 gate_service = GateService()
@@ -0,0 +1,163 @@
+"""
+Health Service
+Probe cameras and gate controllers concurrently and store results in bulk
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from app import db
+from app.models.camera import Camera
+from app.models.gate import Gate
+from app.services.device_http import device_http
+from app.services.gate_drivers import control_target, gate_drivers
+from app.services.status_sync import status_sync
+
+class HealthService:
+    def __init__(self):
+        self.max_workers = int(os.getenv('HEALTH_CHECK_CONCURRENCY', 16))
+        self.timeout = float(os.getenv('HEALTH_CHECK_TIMEOUT', 5))
+
+    def check_fleet(self):
+        """Probe every camera and gate at once and save the results"""
+        try:
+            started = time.perf_counter()
+            cameras = [self.camera_target(camera) for camera in Camera.query.all()]
+            gates = [self.gate_target(gate) for gate in Gate.query.all()]
+
+            camera_results, gate_results = self.probe_all(cameras, gates)
+            self.save_results(camera_results, gate_results)
+
+            return {
+                'success': True,
+                'cameras': self._serialize(camera_results),
+                'gates': self._serialize(gate_results),
+                'summary': {
+                    'cameras_online': sum(1 for r in camera_results if r['status'] == 'online'),
+                    'cameras_total': len(camera_results),
+                    'gates_online': sum(1 for r in gate_results if r['is_online']),
+                    'gates_total': len(gate_results),
+                    'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+                }
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'error': f'Health check error: {str(e)}'
+            }
+
+    def camera_target(self, camera):
+        """Copy the fields a probe needs so worker threads never touch the session"""
+        return {
+            'id': camera.id,
+            'name': camera.name,
+            'url': camera.get_snapshot_url(),
+            'username': camera.username,
+            'password': camera.password
+        }
+
+    def gate_target(self, gate):
+        """Copy the fields a probe needs so worker threads never touch the session"""
+        return dict(control_target(gate), id=gate.id, name=gate.name)
+
+    def probe_all(self, cameras, gates):
+        """Run camera and gate probes with bounded concurrency"""
+        workers = max(1, min(self.max_workers, len(cameras) + len(gates)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            camera_futures = [executor.submit(self.probe_camera, c) for c in cameras]
+            gate_futures = [executor.submit(self.probe_gate, g) for g in gates]
+            return (
+                [future.result() for future in camera_futures],
+                [future.result() for future in gate_futures]
+            )
+
+    def probe_camera(self, target):
+        """Fetch the camera snapshot URL and classify the camera"""
+        result = {'id': target['id'], 'name': target['name']}
+        started = time.perf_counter()
+
+        try:
+            response = device_http.get(
+                target['url'], target['username'], target['password'],
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                result['status'] = 'online'
+            else:
+                result['status'] = 'error'
+                result['error'] = f'HTTP {response.status_code}: {response.reason}'
+
+        except requests.exceptions.RequestException as e:
+            result['status'] = 'offline'
+            result['error'] = f'Connection failed: {str(e)}'
+
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        result['checked_at'] = datetime.utcnow()
+        return result
+
+    def probe_gate(self, target):
+        """Send a status command through the gate's driver"""
+        result = {'id': target['id'], 'name': target['name']}
+
+        if not target['host']:
+            # No controller configured (simulated gate)
+            result.update({'is_online': None, 'latency_ms': None, 'checked_at': None})
+            return result
+
+        started = time.perf_counter()
+        try:
+            reply = gate_drivers.send(target, 'status', self.timeout)
+        except ValueError as e:
+            # Unknown control method: the controller cannot be reached
+            reply = {'reachable': False, 'error': str(e)}
+        # Any answer means the controller itself is reachable
+        result['is_online'] = reply['reachable']
+        if reply['reachable']:
+            result['controller_state'] = reply.get('state')
+        else:
+            result['error'] = reply['error']
+
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        result['checked_at'] = datetime.utcnow()
+        return result
+
+    def save_results(self, camera_results, gate_results):
+        """Write probe results back in one transaction"""
+        camera_rows = []
+        for result in camera_results:
+            row = {'id': result['id'], 'status': result['status']}
+            if result['status'] == 'online':
+                row['last_heartbeat'] = result['checked_at']
+            camera_rows.append(row)
+
+        gate_rows = []
+        for result in gate_results:
+            if result['is_online'] is None:
+                continue
+            row = {'id': result['id'], 'is_online': result['is_online']}
+            if result['is_online']:
+                row['last_heartbeat'] = result['checked_at']
+            gate_rows.append(row)
+
+        if camera_rows:
+            db.session.bulk_update_mappings(Camera, camera_rows)
+        if gate_rows:
+            db.session.bulk_update_mappings(Gate, gate_rows)
+        db.session.commit()
+
+        # Bulk updates bypass the session, so the change log is told directly
+        status_sync.record('camera', [row['id'] for row in camera_rows])
+        status_sync.record('gate', [row['id'] for row in gate_rows])
+
+    def _serialize(self, results):
+        return [
+            dict(r, checked_at=r['checked_at'].isoformat() if r['checked_at'] else None)
+            for r in results
+        ]
+
+# Global health service instance
+health_service = HealthService()
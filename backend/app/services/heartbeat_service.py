@@ -0,0 +1,205 @@
+"""
+Heartbeat Service
+Background scheduler that probes every device on its own adaptive interval
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.models.camera import Camera
+from app.models.gate import Gate
+from app.services.event_bus import event_bus
+from app.services.health_service import health_service
+
+class HeartbeatScheduler:
+    def __init__(self):
+        self.enabled = os.getenv('HEARTBEAT_ENABLED', 'True').lower() == 'true'
+        self.interval = float(os.getenv('HEARTBEAT_INTERVAL', 30))
+        self.fast_interval = float(os.getenv('HEARTBEAT_FAST_INTERVAL', 5))
+        self.max_interval = float(os.getenv('HEARTBEAT_MAX_INTERVAL', 600))
+        self.refresh_interval = float(os.getenv('HEARTBEAT_REFRESH_INTERVAL', 60))
+        # Steady online devices still get last_heartbeat written this often
+        self.touch_interval = float(os.getenv('HEARTBEAT_TOUCH_INTERVAL', 300))
+        self.devices = {}   # ('camera' | 'gate', id) -> schedule state
+        self.persisted = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last_refresh = 0
+
+    def start(self, app):
+        """Start the scheduler thread once per process"""
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(app,), name='heartbeat-scheduler', daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def get_status(self):
+        """Get the schedule and last result of every device"""
+        now = time.monotonic()
+        devices = []
+        for (kind, device_id), state in sorted(list(self.devices.items())):
+            devices.append({
+                'type': kind,
+                'id': device_id,
+                'state': state['state'],
+                'failures': state['failures'],
+                'interval_seconds': state['interval'],
+                'next_probe_in': round(max(state['next_due'] - now, 0), 1),
+                'last_latency_ms': state['last_latency_ms']
+            })
+
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'devices': devices,
+            'total': len(devices),
+            'transitions_persisted': self.persisted
+        }
+
+    def _run(self, app):
+        with ThreadPoolExecutor(max_workers=health_service.max_workers) as executor:
+            while not self._stop.is_set():
+                try:
+                    with app.app_context():
+                        self._tick(executor)
+                except Exception as e:
+                    print(f"Heartbeat scheduler error: {e}")
+
+                self._stop.wait(self._sleep_time())
+
+    def _tick(self, executor):
+        now = time.monotonic()
+        if now - self._last_refresh >= self.refresh_interval:
+            self._refresh_devices()
+            self._last_refresh = now
+
+        due = [key for key, state in self.devices.items() if state['next_due'] <= now]
+        if not due:
+            return
+
+        futures = {}
+        for key in due:
+            state = self.devices[key]
+            probe = health_service.probe_camera if key[0] == 'camera' else health_service.probe_gate
+            futures[key] = executor.submit(probe, state['target'])
+
+        camera_updates = []
+        gate_updates = []
+        transitions = []
+        for key, future in futures.items():
+            result = future.result()
+            previous = self.devices[key]['state'] if key in self.devices else None
+            if self._record(key, result):
+                (camera_updates if key[0] == 'camera' else gate_updates).append(result)
+                if self.devices[key]['state'] != previous:
+                    transitions.append((key, result))
+
+        if camera_updates or gate_updates:
+            health_service.save_results(camera_updates, gate_updates)
+            self.persisted += len(camera_updates) + len(gate_updates)
+
+        for (kind, device_id), result in transitions:
+            if kind == 'camera':
+                event_bus.publish('camera', {
+                    'camera_id': device_id, 'name': result['name'], 'status': result['status']
+                })
+            else:
+                event_bus.publish('gate', {
+                    'gate_id': device_id, 'name': result['name'], 'is_online': result['is_online']
+                })
+
+    def _record(self, key, result):
+        """Update a device's schedule; return True if the result must be saved"""
+        state = self.devices.get(key)
+        if state is None:
+            return False
+
+        now = time.monotonic()
+        new_state = result['status'] if key[0] == 'camera' else result['is_online']
+        healthy = new_state in ('online', True)
+        changed = new_state != state['state']
+
+        if changed:
+            # Confirm the new state quickly
+            state['failures'] = 0 if healthy else 1
+            state['interval'] = self.fast_interval
+        elif healthy:
+            state['failures'] = 0
+            state['interval'] = self.interval
+        else:
+            # Back off exponentially while the device stays down
+            state['failures'] += 1
+            state['interval'] = min(self.interval * 2 ** (state['failures'] - 1), self.max_interval)
+
+        state['state'] = new_state
+        state['last_latency_ms'] = result['latency_ms']
+        state['next_due'] = now + state['interval']
+
+        touch = healthy and now - state['last_persisted'] >= self.touch_interval
+        if changed or touch:
+            state['last_persisted'] = now
+            return True
+        return False
+
+    def _refresh_devices(self):
+        """Sync the device list and known states from the database"""
+        now = time.monotonic()
+        seen = set()
+
+        for camera in Camera.query.all():
+            key = ('camera', camera.id)
+            seen.add(key)
+            self._upsert_device(key, health_service.camera_target(camera), camera.status, now)
+
+        for gate in Gate.query.all():
+            target = health_service.gate_target(gate)
+            if not target['host']:
+                continue
+            key = ('gate', gate.id)
+            seen.add(key)
+            self._upsert_device(key, target, gate.is_online, now)
+
+        for key in [k for k in self.devices if k not in seen]:
+            del self.devices[key]
+
+    def _upsert_device(self, key, target, db_state, now):
+        state = self.devices.get(key)
+        if state is None:
+            self.devices[key] = {
+                'target': target,
+                'state': db_state,
+                'failures': 0,
+                'interval': self.interval,
+                'next_due': now,
+                'last_persisted': now,
+                'last_latency_ms': None
+            }
+        else:
+            # Pick up config edits and status written by other code paths
+            state['target'] = target
+            state['state'] = db_state
+
+    def _sleep_time(self):
+        if not self.devices:
+            return 1.0
+        next_due = min(state['next_due'] for state in self.devices.values())
+        return min(max(next_due - time.monotonic(), 0.1), 1.0)
+
+# Global heartbeat scheduler instance
+heartbeat_scheduler = HeartbeatScheduler()
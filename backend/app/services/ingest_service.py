@@ -0,0 +1,224 @@
+"""
+Ingest Service
+Validate pushed ANPR events and run them through the access pipeline;
+their logs go to the write-behind writer
+"""
+
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import partial
+from app import db
+from app.services.access_log_writer import access_log_writer
+from app.services.access_service import access_service
+from app.services.plate_index import plate_index
+from app.services.read_dedup import read_dedup
+
+DIRECTIONS = {
+    'entry': 'entry',
+    'exit': 'exit',
+    'forward': 'entry',
+    'reverse': 'exit',
+}
+
+def _parse_timestamp(value):
+    """Parse an ISO timestamp into a naive UTC datetime"""
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+class IngestService:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=int(os.getenv('INGEST_QUEUE_MAX', 10000)))
+        self.accepted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_lag_ms = None
+        self.max_lag_ms = 0.0
+        self.index_retry_interval = float(os.getenv('PLATE_INDEX_RETRY_INTERVAL', 30))
+        self._index_retry_at = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def validate(self, data):
+        """Validate one pushed event; returns (event, error)"""
+        if not isinstance(data, dict):
+            return None, 'Event must be an object'
+
+        license_plate = str(data.get('license_plate') or '').strip()
+        if not license_plate:
+            return None, 'Missing required field: license_plate'
+        if len(license_plate) > 20:
+            return None, 'license_plate is too long'
+
+        camera_id = data.get('camera_id')
+        if camera_id is not None and not isinstance(camera_id, int):
+            return None, 'camera_id must be an integer'
+
+        confidence = data.get('confidence')
+        if confidence is not None:
+            try:
+                confidence = float(confidence)
+            except (TypeError, ValueError):
+                return None, 'confidence must be a number'
+            # Accept both 0..1 and Hikvision's 0..100 scale
+            if confidence > 1:
+                confidence /= 100
+            if not 0 <= confidence <= 1:
+                return None, 'confidence out of range'
+
+        direction = data.get('direction')
+        if direction is not None:
+            direction = DIRECTIONS.get(str(direction).lower())
+            if direction is None:
+                return None, 'direction must be entry, exit, forward or reverse'
+
+        try:
+            timestamp = _parse_timestamp(data['timestamp']) if data.get('timestamp') else datetime.utcnow()
+        except ValueError:
+            return None, 'timestamp must be ISO 8601'
+
+        return {
+            'camera_id': camera_id,
+            'license_plate': license_plate,
+            'confidence': confidence,
+            'direction': direction,
+            'timestamp': timestamp
+        }, None
+
+    def ingest(self, payloads):
+        """Validate and queue a list of pushed events"""
+        accepted = 0
+        errors = []
+
+        for index, data in enumerate(payloads):
+            event, error = self.validate(data)
+            if error is None and not self.submit(event):
+                error = 'Ingest queue is full'
+            elif error is not None:
+                self.rejected += 1
+
+            if error:
+                errors.append({'index': index, 'error': error})
+            else:
+                accepted += 1
+
+        return {
+            'success': not errors,
+            'accepted': accepted,
+            'rejected': len(errors),
+            'errors': errors,
+            'queue_depth': self.queue.qsize()
+        }
+
+    def submit(self, event):
+        """Queue a validated event; returns False if the queue is full
+
+        Duplicate reads of a car already seen are absorbed here and count
+        as accepted; a better one is queued to amend the first read's log.
+        """
+        event['received_at'] = time.monotonic()
+        event['event_id'] = uuid.uuid4().hex
+        if not read_dedup.admit(event) and not event.get('amends'):
+            return True
+
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+        self.accepted += 1
+        return True
+
+    def start(self, app):
+        """Start the drain thread once per process"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+
+            self._thread = threading.Thread(
+                target=self._drain, args=(app,), name='anpr-ingest', daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def get_stats(self):
+        """Get queue depth, throughput counters and ingest lag"""
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'dropped': self.dropped,
+            'processed': self.processed,
+            'failed': self.failed,
+            'last_lag_ms': self.last_lag_ms,
+            'max_lag_ms': round(self.max_lag_ms, 1),
+            'dedup': read_dedup.get_stats(),
+            'writer': access_log_writer.get_stats()
+        }
+
+    def _drain(self, app):
+        while True:
+            event = self.queue.get()
+
+            # Decide from memory and queue the gate open, then journal the
+            # log; the database is written behind
+            with app.app_context():
+                try:
+                    if event.get('amends'):
+                        access_log_writer.amend_access_log(
+                            event['amends'], **access_service.build_amendment(event)
+                        )
+                        continue
+
+                    decision, event, trace = access_service.handle_event(event)
+                    row = access_service.build_access_row(event, decision, trace.gate_id)
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Failed to handle ANPR event {event.get('license_plate')}: {e}")
+                    continue
+
+            access_log_writer.add_access_log(row, on_written=partial(self._record_written, trace))
+
+            if not plate_index.loaded:
+                self._retry_index_load(app)
+
+    def _retry_index_load(self, app):
+        """Load the plate index once the database is back; until then plates are denied"""
+        now = time.monotonic()
+        if now < self._index_retry_at:
+            return
+        self._index_retry_at = now + self.index_retry_interval
+
+        with app.app_context():
+            try:
+                plate_index.load()
+                print("✅ Plate index loaded")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Plate index still unavailable: {e}")
+
+    def _record_written(self, trace, success):
+        if not success:
+            self.failed += 1
+            return
+
+        now = time.monotonic()
+        trace.mark('logged', now)
+
+        lag_ms = (now - trace.marks['seen']) * 1000
+        self.processed += 1
+        self.last_lag_ms = round(lag_ms, 1)
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+# Global ingest service instance
+ingest_service = IngestService()
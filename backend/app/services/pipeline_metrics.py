@@ -0,0 +1,118 @@
+"""
+Pipeline Metrics Service
+Stage timings and plate-to-barrier latency percentiles per gate
+"""
+
+import os
+import threading
+from collections import deque
+
+STAGES = ('seen', 'decided', 'command_sent', 'gate_open', 'logged')
+
+def _percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    rank = max(int(round(pct / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return round(ordered[min(rank, len(ordered) - 1)], 1)
+
+class PipelineTrace:
+    """Monotonic timestamps for one event moving through the pipeline"""
+
+    def __init__(self, seen_at):
+        self.marks = {'seen': seen_at}
+        self.gate_id = None
+        self.license_plate = None
+        self.outcome = None
+
+    def mark(self, stage, at):
+        self.marks[stage] = at
+
+    def offsets_ms(self):
+        """Milliseconds from 'seen' to every recorded stage"""
+        seen = self.marks['seen']
+        return {
+            stage: round((self.marks[stage] - seen) * 1000, 1)
+            for stage in STAGES if stage in self.marks
+        }
+
+    def open_latency_ms(self):
+        if 'gate_open' not in self.marks:
+            return None
+        return (self.marks['gate_open'] - self.marks['seen']) * 1000
+
+class PipelineMetrics:
+    def __init__(self):
+        self.target_ms = float(os.getenv('PIPELINE_LATENCY_TARGET_MS', 500))
+        self.window = int(os.getenv('PIPELINE_LATENCY_WINDOW', 1000))
+        self._samples = {}    # gate id -> deque of seen-to-open latencies (ms)
+        self._recent = {}     # gate id -> deque of recent traces (still gaining marks)
+        self._outcomes = {}   # gate id -> {outcome: count}
+        self._lock = threading.Lock()
+
+    def record(self, trace):
+        """Record a trace once its gate command finished (or none was sent)
+
+        The latency sample is taken now; marks added later, such as
+        'logged' when the row is stored, still show in the recent traces.
+        """
+        gate_id = trace.gate_id
+        latency = trace.open_latency_ms()
+
+        with self._lock:
+            if gate_id not in self._recent:
+                self._samples[gate_id] = deque(maxlen=self.window)
+                self._recent[gate_id] = deque(maxlen=20)
+                self._outcomes[gate_id] = {}
+
+            if latency is not None:
+                self._samples[gate_id].append(latency)
+            self._recent[gate_id].append(trace)
+            outcomes = self._outcomes[gate_id]
+            outcomes[trace.outcome] = outcomes.get(trace.outcome, 0) + 1
+
+    def get_stats(self, gate_id=None):
+        """Get p50/p95/p99 seen-to-open latency per gate"""
+        with self._lock:
+            gate_ids = [gate_id] if gate_id is not None else list(self._recent)
+            gates = []
+            for key in gate_ids:
+                if key not in self._recent:
+                    continue
+                ordered = sorted(self._samples[key])
+                within = sum(1 for value in ordered if value <= self.target_ms)
+                gates.append({
+                    'gate_id': key,
+                    'samples': len(ordered),
+                    'p50_ms': _percentile(ordered, 50),
+                    'p95_ms': _percentile(ordered, 95),
+                    'p99_ms': _percentile(ordered, 99),
+                    'max_ms': round(ordered[-1], 1) if ordered else None,
+                    'within_target': round(within / len(ordered), 4) if ordered else None,
+                    'outcomes': dict(self._outcomes[key]),
+                    'recent': [
+                        {
+                            'license_plate': trace.license_plate,
+                            'outcome': trace.outcome,
+                            'stages_ms': trace.offsets_ms()
+                        }
+                        for trace in self._recent[key]
+                    ]
+                })
+
+        gates.sort(key=lambda item: (item['gate_id'] is None, item['gate_id'] or 0))
+        return {
+            'target_ms': self.target_ms,
+            'window': self.window,
+            'gates': gates
+        }
+
+    def reset(self):
+        """Drop all recorded samples"""
+        with self._lock:
+            self._samples.clear()
+            self._recent.clear()
+            self._outcomes.clear()
+
+# Global pipeline metrics instance
+pipeline_metrics = PipelineMetrics()
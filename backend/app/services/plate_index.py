@@ -0,0 +1,221 @@
+"""
+Plate Index Service
+In-memory authorization index for fast access decisions: registered
+vehicles, camera match thresholds and the gate each camera watches
+"""
+
+import threading
+from datetime import datetime
+from app import db
+from app.models.camera import Camera
+from app.models.gate import Gate
+from app.models.vehicle import Vehicle
+from app.services.gate_drivers import gate_ref
+from app.services.plate_matcher import PlateMatcher
+from app.utils.plate import normalize_plate
+
+class PlateIndex:
+    def __init__(self):
+        self._entries = {}       # normalized plate -> authorization entry
+        self._plates_by_id = {}  # vehicle id -> normalized plate
+        self._camera_thresholds = {}  # camera id -> fuzzy match threshold
+        self._gates = {}         # gate id -> gate ref
+        self._gates_by_camera = {}    # camera id -> gate ref (newest gate wins)
+        self._lock = threading.Lock()
+        self.matcher = PlateMatcher()
+        self.loaded = False
+        self.loaded_at = None
+
+    def load(self):
+        """Load every vehicle, camera threshold and gate into the index (needs app context)"""
+        entries = {}
+        plates_by_id = {}
+        for vehicle in Vehicle.query.all():
+            plate = normalize_plate(vehicle.license_plate)
+            entries[plate] = self._make_entry(vehicle)
+            plates_by_id[vehicle.id] = plate
+
+        thresholds = dict(db.session.query(Camera.id, Camera.confidence_threshold).all())
+        gates = {gate.id: gate_ref(gate) for gate in Gate.query.all()}
+
+        with self._lock:
+            self._entries = entries
+            self._plates_by_id = plates_by_id
+            self._camera_thresholds = thresholds
+            self._gates = gates
+            self._index_gates()
+            self.matcher.rebuild(entries.keys())
+            self.loaded = True
+            self.loaded_at = datetime.utcnow()
+
+        return len(entries)
+
+    def ensure_loaded(self):
+        """Load the index on first use"""
+        if not self.loaded:
+            self.load()
+
+    def upsert(self, vehicle):
+        """Add or refresh a vehicle after it was committed"""
+        plate = normalize_plate(vehicle.license_plate)
+        entry = self._make_entry(vehicle)
+
+        with self._lock:
+            # Drop the old key if the plate itself was changed
+            old_plate = self._plates_by_id.get(vehicle.id)
+            if old_plate and old_plate != plate:
+                self._entries.pop(old_plate, None)
+                self.matcher.remove(old_plate)
+
+            self._entries[plate] = entry
+            self._plates_by_id[vehicle.id] = plate
+            self.matcher.add(plate)
+
+    def remove(self, vehicle_id):
+        """Remove a deleted vehicle from the index"""
+        with self._lock:
+            plate = self._plates_by_id.pop(vehicle_id, None)
+            if plate:
+                self._entries.pop(plate, None)
+                self.matcher.remove(plate)
+
+    def set_camera(self, camera):
+        """Refresh a camera's fuzzy match threshold after it was committed"""
+        with self._lock:
+            self._camera_thresholds[camera.id] = camera.confidence_threshold
+
+    def set_gate(self, gate):
+        """Refresh a gate's ref after it was committed"""
+        with self._lock:
+            self._gates[gate.id] = gate_ref(gate)
+            self._index_gates()
+
+    def gate_for_camera(self, camera_id):
+        """Get the ref of the gate a camera watches, or None"""
+        return self._gates_by_camera.get(camera_id) if camera_id else None
+
+    def get(self, license_plate):
+        """Get the raw index entry for a plate, or None"""
+        return self._entries.get(normalize_plate(license_plate))
+
+    def match(self, license_plate, min_score=0.5, limit=5, budget_ms=None):
+        """Find registered vehicles similar to an ANPR read"""
+        candidates, complete = self.matcher.search(
+            normalize_plate(license_plate), min_score, limit, budget_ms
+        )
+
+        for candidate in candidates:
+            entry = self._entries.get(candidate['license_plate'])
+            if entry:
+                candidate['license_plate'] = entry['license_plate']
+                candidate['vehicle_id'] = entry['vehicle_id']
+
+        return {
+            'candidates': [c for c in candidates if 'vehicle_id' in c],
+            'complete': complete
+        }
+
+    def check_access(self, license_plate, now=None, min_score=None, budget_ms=None):
+        """Decide whether a plate may pass, using only in-memory state
+
+        If there is no exact match and min_score is given, the best fuzzy
+        candidate scoring at least min_score is used instead.
+        """
+        plate = normalize_plate(license_plate)
+        now = now or datetime.utcnow()
+        entry = self._entries.get(plate)
+
+        if entry is not None:
+            return self._verdict(entry, now)
+
+        if min_score is not None:
+            result = self.matcher.search(plate, min_score, 5, budget_ms)[0]
+            best = [c for c in result if c['score'] == result[0]['score']] if result else []
+            verdicts = [
+                self._verdict(self._entries[c['license_plate']], now)
+                for c in best if c['license_plate'] in self._entries
+            ]
+
+            if verdicts:
+                verdict = verdicts[0]
+                # Equally good candidates must agree before the gate opens
+                if any(not v['access_allowed'] for v in verdicts):
+                    verdict = dict(verdict, access_allowed=False)
+                    if len(verdicts) > 1:
+                        verdict['reason'] = 'ambiguous_match'
+                verdict['match'] = {
+                    'method': 'fuzzy',
+                    'read_plate': plate,
+                    'score': best[0]['score'],
+                    'candidates': len(verdicts)
+                }
+                return verdict
+
+        return {
+            'license_plate': plate,
+            'registered': False,
+            'access_allowed': False,
+            'reason': 'not_registered',
+            'vehicle_id': None
+        }
+
+    def decide(self, license_plate, camera_id=None, now=None):
+        """Check a plate, falling back to OCR-tolerant matching at the camera's threshold"""
+        decision = self.check_access(license_plate, now=now)
+
+        threshold = self._camera_thresholds.get(camera_id) if camera_id else None
+        if not decision['registered'] and threshold:
+            decision = self.check_access(license_plate, now=now, min_score=threshold)
+
+        return decision
+
+    def _verdict(self, entry, now):
+        expires_at = entry['expires_at']
+
+        if entry['status'] != 'active':
+            reason = entry['status'] or 'inactive'
+        elif not entry['is_permanent'] and (not expires_at or now > expires_at):
+            reason = 'expired'
+        else:
+            reason = 'authorized'
+
+        return {
+            'license_plate': entry['license_plate'],
+            'registered': True,
+            'access_allowed': reason == 'authorized',
+            'reason': reason,
+            'vehicle_id': entry['vehicle_id'],
+            'is_permanent': entry['is_permanent'],
+            'expires_at': expires_at.isoformat() if expires_at else None
+        }
+
+    def get_stats(self):
+        """Get index size and load time"""
+        return {
+            'loaded': self.loaded,
+            'size': len(self._entries),
+            'cameras': len(self._camera_thresholds),
+            'gates': len(self._gates),
+            'matcher': self.matcher.get_stats(),
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None
+        }
+
+    def _index_gates(self):
+        by_camera = {}
+        for gate_id in sorted(self._gates):
+            ref = self._gates[gate_id]
+            if ref['camera_id']:
+                by_camera[ref['camera_id']] = ref
+        self._gates_by_camera = by_camera
+
+    def _make_entry(self, vehicle):
+        return {
+            'vehicle_id': vehicle.id,
+            'license_plate': vehicle.license_plate,
+            'status': vehicle.status,
+            'is_permanent': vehicle.is_permanent,
+            'expires_at': vehicle.expires_at
+        }
+
+# Global plate index instance
+plate_index = PlateIndex()
@@ -0,0 +1,208 @@
+"""
+Plate Matcher Service
+OCR-tolerant plate similarity search (BK-tree over weighted edit distance)
+"""
+
+import re
+import threading
+import time
+
+# Glyphs that ANPR engines commonly confuse, with the substitution cost
+# inside each group. Every other substitution, insertion or deletion costs
+# 1.0. Groups are disjoint so the distance stays a metric for the BK-tree.
+CONFUSION_GROUPS = [
+    ('0ODQ', 0.1),
+    ('8B', 0.1),
+    ('1IL', 0.1),
+    ('5S', 0.1),
+    ('2Z', 0.15),
+    ('6G', 0.15),
+    ('ขฃชซ', 0.15),
+    ('คฅดตศ', 0.2),
+    ('ฎฏ', 0.15),
+    ('บป', 0.15),
+    ('ผฝ', 0.15),
+    ('พฟ', 0.15),
+    ('ถภ', 0.15),
+    ('อฮ', 0.2),
+    ('ลส', 0.2),
+]
+
+# Added when both plates carry a province line and the lines differ
+PROVINCE_MISMATCH_COST = 0.5
+
+_SUBSTITUTION_COSTS = {}
+for _chars, _cost in CONFUSION_GROUPS:
+    for _a in _chars:
+        for _b in _chars:
+            if _a != _b:
+                _SUBSTITUTION_COSTS[(_a, _b)] = _cost
+
+# The province line is the run of Thai script after the last digit/Latin glyph
+_PLATE_PARTS = re.compile(r'^(.*[0-9A-Z])([\u0E00-\u0E7F]*)$')
+
+def split_plate(plate):
+    """Split a normalized plate into (number, province)"""
+    match = _PLATE_PARTS.match(plate)
+    if not match:
+        return plate, ''
+    return match.group(1), match.group(2)
+
+def plate_distance(a, b):
+    """Weighted edit distance using the confusion cost table"""
+    if a == b:
+        return 0.0
+
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        current = [float(i)]
+        for j, char_b in enumerate(b, 1):
+            if char_a == char_b:
+                substitution = 0.0
+            else:
+                substitution = _SUBSTITUTION_COSTS.get((char_a, char_b), 1.0)
+            current.append(min(
+                previous[j] + 1.0,
+                current[j - 1] + 1.0,
+                previous[j - 1] + substitution
+            ))
+        previous = current
+
+    return previous[-1]
+
+def distance_to_score(distance):
+    """Map a distance to a 0..1 similarity score (1.0 is an exact match)"""
+    return 1.0 / (1.0 + distance)
+
+def score_to_distance(score):
+    """Largest distance that still reaches the given score"""
+    if score <= 0:
+        return float('inf')
+    return 1.0 / score - 1.0
+
+class _Node:
+    __slots__ = ('number', 'children')
+
+    def __init__(self, number):
+        self.number = number
+        self.children = {}
+
+class PlateMatcher:
+    def __init__(self, default_budget_ms=20):
+        self.default_budget_ms = default_budget_ms
+        self._root = None
+        self._plates = {}   # plate number -> set of full normalized plates
+        self._node_count = 0
+        self._lock = threading.Lock()
+
+    def rebuild(self, plates):
+        """Rebuild the tree from an iterable of normalized plates"""
+        with self._lock:
+            self._root = None
+            self._plates = {}
+            self._node_count = 0
+            for plate in plates:
+                self._add(plate)
+
+    def add(self, plate):
+        """Add a normalized plate"""
+        with self._lock:
+            self._add(plate)
+
+    def remove(self, plate):
+        """Remove a normalized plate (tree nodes are pruned on rebuild)"""
+        with self._lock:
+            number, _ = split_plate(plate)
+            plates = self._plates.get(number)
+            if plates:
+                plates.discard(plate)
+                if not plates:
+                    del self._plates[number]
+
+            # Rebuild once dead nodes dominate the tree
+            if self._node_count > 64 and self._node_count > 2 * len(self._plates):
+                live = [p for group in self._plates.values() for p in group]
+                self._root = None
+                self._plates = {}
+                self._node_count = 0
+                for live_plate in live:
+                    self._add(live_plate)
+
+    def search(self, plate, min_score=0.5, limit=5, budget_ms=None):
+        """Find registered plates similar to an ANPR read
+
+        Returns (candidates, complete) where candidates are sorted by score
+        and complete is False if the latency budget cut the search short.
+        """
+        budget_ms = self.default_budget_ms if budget_ms is None else budget_ms
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        number, province = split_plate(plate)
+        radius = score_to_distance(min_score)
+        results = []
+        complete = True
+
+        with self._lock:
+            stack = [self._root] if self._root else []
+            while stack:
+                if time.perf_counter() > deadline:
+                    complete = False
+                    break
+
+                node = stack.pop()
+                distance = plate_distance(number, node.number)
+
+                if distance <= radius:
+                    for candidate in self._plates.get(node.number, ()):
+                        total = distance
+                        _, candidate_province = split_plate(candidate)
+                        if province and candidate_province and province != candidate_province:
+                            total += PROVINCE_MISMATCH_COST
+                        if total <= radius:
+                            results.append((candidate, total))
+
+                # Edges are rounded to 3 places, so widen the window slightly
+                for edge, child in node.children.items():
+                    if distance - radius - 0.001 <= edge <= distance + radius + 0.001:
+                        stack.append(child)
+
+        results.sort(key=lambda item: item[1])
+        candidates = [
+            {
+                'license_plate': candidate,
+                'distance': round(distance, 3),
+                'score': round(distance_to_score(distance), 3)
+            }
+            for candidate, distance in results[:limit]
+        ]
+        return candidates, complete
+
+    def get_stats(self):
+        """Get tree size statistics"""
+        return {
+            'plates': sum(len(group) for group in self._plates.values()),
+            'nodes': self._node_count
+        }
+
+    def _add(self, plate):
+        number, _ = split_plate(plate)
+        plates = self._plates.setdefault(number, set())
+        plates.add(plate)
+        if len(plates) > 1:
+            return
+
+        if self._root is None:
+            self._root = _Node(number)
+            self._node_count = 1
+            return
+
+        node = self._root
+        while True:
+            distance = round(plate_distance(number, node.number), 3)
+            if distance == 0:
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(number)
+                self._node_count += 1
+                return
+            node = child
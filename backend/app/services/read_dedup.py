@@ -0,0 +1,83 @@
+"""
+Read Dedup Service
+Suppress repeated ANPR reads of the same car within a time window
+"""
+
+import os
+import threading
+import time
+from app.utils.plate import normalize_plate
+
+class ReadDeduplicator:
+    def __init__(self):
+        self.window = float(os.getenv('ANPR_DEDUP_WINDOW', 5))
+        self._reads = {}   # (camera id, normalized plate) -> kept read
+        self._lock = threading.Lock()
+        self._last_purge = time.monotonic()
+        self.admitted = 0
+        self.suppressed = 0
+        self.upgraded = 0
+
+    def admit(self, event):
+        """Return True for the first read of a car, False for a duplicate
+
+        The window slides with every read, so a car creeping through the
+        detection zone stays one event. A duplicate with a higher confidence
+        than any read so far gets event['amends'] set to the kept read's
+        event_id; its confidence and picture should amend that access log.
+        Queued events are never modified.
+        """
+        if self.window <= 0:
+            return True
+
+        key = (event.get('camera_id'), normalize_plate(event['license_plate']))
+        seen_at = event['timestamp']
+        now = time.monotonic()
+
+        with self._lock:
+            if now - self._last_purge >= self.window:
+                self._purge(now)
+
+            kept = self._reads.get(key)
+            if kept and abs((seen_at - kept['last_seen']).total_seconds()) <= self.window:
+                kept['last_seen'] = max(seen_at, kept['last_seen'])
+                kept['touched'] = now
+                self.suppressed += 1
+
+                if (event.get('confidence') or 0) > kept['confidence']:
+                    kept['confidence'] = event['confidence']
+                    event['amends'] = kept['event_id']
+                    self.upgraded += 1
+                return False
+
+            self._reads[key] = {
+                'event_id': event['event_id'],
+                'confidence': event.get('confidence') or 0,
+                'last_seen': seen_at,
+                'touched': now
+            }
+            self.admitted += 1
+            return True
+
+    def get_stats(self):
+        """Get dedup window counters"""
+        with self._lock:
+            tracked = len(self._reads)
+
+        return {
+            'window_seconds': self.window,
+            'tracked': tracked,
+            'admitted': self.admitted,
+            'suppressed': self.suppressed,
+            'upgraded': self.upgraded
+        }
+
+    def _purge(self, now):
+        """Forget reads whose window has passed (by arrival time)"""
+        expired = [key for key, kept in self._reads.items() if now - kept['touched'] > self.window]
+        for key in expired:
+            del self._reads[key]
+        self._last_purge = now
+
+# Global read deduplicator instance
+read_dedup = ReadDeduplicator()
@@ -0,0 +1,146 @@
+"""
+Response Cache
+Cache JSON responses of read endpoints until a table they read is written
+
+Every committed INSERT/UPDATE/DELETE bumps a version counter for its table
+(caught with SQLAlchemy events, so bulk writes count too). A cached
+response is served while the versions of its tables are unchanged and it
+is younger than the TTL, which bounds drift of time-relative numbers such
+as "last 24 hours". Responses carry an ETag; a matching If-None-Match gets
+a 304 without touching the database or serializing anything.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+from flask import Response, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+class ResponseCache:
+    def __init__(self):
+        self.enabled = os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+        self.ttl = float(os.getenv('RESPONSE_CACHE_TTL', 30))
+        self.max_entries = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 256))
+        self._versions = {}       # table name -> version
+        self._entries = {}        # request path -> cached response
+        self._lock = threading.Lock()
+        self._changed = threading.local()   # tables written in this thread's open transaction
+        self._engines = set()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def init_app(self, app, db):
+        """Watch the app's engine for writes"""
+        with app.app_context():
+            engine = db.engine
+
+        with self._lock:
+            if engine in self._engines:
+                return
+            self._engines.add(engine)
+
+        event.listen(engine, 'after_execute', self._after_execute)
+        event.listen(engine, 'rollback', self._after_rollback)
+        if not event.contains(Session, 'after_commit', self._after_commit):
+            event.listen(Session, 'after_commit', self._after_commit)
+
+    def invalidate(self, *tables):
+        """Bump the version of tables whose data changed"""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            self.invalidations += 1
+
+    def cached(self, *tables):
+        """Decorate a GET view whose response depends only on these tables"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                key = request.full_path
+                versions = self._snapshot(tables)
+                entry = self._entries.get(key)
+                if (entry and entry['versions'] == versions
+                        and time.monotonic() - entry['stored_at'] < self.ttl):
+                    self.hits += 1
+                    return self._respond(entry)
+
+                # Versions are taken before the view runs, so a write that
+                # commits meanwhile leaves this entry already out of date
+                self.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+                body = response.get_data()
+                entry = {
+                    'versions': versions,
+                    'stored_at': time.monotonic(),
+                    'body': body,
+                    'mimetype': response.mimetype,
+                    'etag': hashlib.sha1(body).hexdigest()
+                }
+                with self._lock:
+                    self._entries.pop(key, None)
+                    self._entries[key] = entry
+                    while len(self._entries) > self.max_entries:
+                        self._entries.pop(next(iter(self._entries)))
+                return self._respond(entry)
+
+            return wrapper
+        return decorator
+
+    def get_stats(self):
+        """Get hit counters and table versions"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'ttl_seconds': self.ttl,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'invalidations': self.invalidations,
+                'versions': dict(self._versions)
+            }
+
+    def _snapshot(self, tables):
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def _respond(self, entry):
+        if entry['etag'] in request.if_none_match:
+            self.not_modified += 1
+            response = Response(status=304)
+        else:
+            response = Response(entry['body'], mimetype=entry['mimetype'])
+        response.set_etag(entry['etag'])
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _after_execute(self, conn, clauseelement, multiparams, params, execution_options, result):
+        if isinstance(clauseelement, UpdateBase):
+            tables = getattr(self._changed, 'tables', None)
+            if tables is None:
+                tables = self._changed.tables = set()
+            tables.add(clauseelement.table.name)
+
+    def _after_rollback(self, conn):
+        self._changed.tables = None
+
+    def _after_commit(self, session):
+        tables = getattr(self._changed, 'tables', None)
+        if tables:
+            self._changed.tables = None
+            self.invalidate(*tables)
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,85 @@
+"""
+Snapshot Cache Service
+Share camera snapshots between viewers with a freshness TTL and
+single-flight fetching so each camera sees at most one request at a time
+"""
+
+import os
+import threading
+import time
+from app.utils.cache import ByteLRUCache
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+class SnapshotCache:
+    def __init__(self):
+        self.ttl = float(os.getenv('SNAPSHOT_CACHE_TTL', 1.0))
+        self.wait_timeout = 15
+        self._store = ByteLRUCache(int(os.getenv('SNAPSHOT_CACHE_MAX_BYTES', 32 * 1024 * 1024)))
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_fetch(self, camera_id, fetch):
+        """Get a fresh snapshot result, calling fetch() at most once at a time"""
+        cached = self._store.get(camera_id)
+        if cached and time.monotonic() - cached['cached_at'] < self.ttl:
+            self.hits += 1
+            return cached['result']
+
+        with self._lock:
+            flight = self._inflight.get(camera_id)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[camera_id] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if flight.event.wait(self.wait_timeout) and flight.result is not None:
+                return flight.result
+            return {'success': False, 'error': 'Snapshot fetch timed out'}
+
+        result = None
+        try:
+            result = fetch()
+            if result.get('success'):
+                self._store.put(
+                    camera_id,
+                    {'result': result, 'cached_at': time.monotonic()},
+                    len(result['content'])
+                )
+            return result
+        finally:
+            flight.result = result
+            with self._lock:
+                self._inflight.pop(camera_id, None)
+            flight.event.set()
+
+    def invalidate(self, camera_id):
+        """Drop the cached snapshot for a camera"""
+        self._store.pop(camera_id)
+
+    def get_stats(self):
+        """Get hit/miss counters and memory usage"""
+        store = self._store.get_stats()
+        return {
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'entries': store['entries'],
+            'bytes': store['bytes'],
+            'max_bytes': store['max_bytes'],
+            'evictions': store['evictions']
+        }
+
+# Global snapshot cache instance
+snapshot_cache = SnapshotCache()
@@ -0,0 +1,94 @@
+"""
+Snapshot Variants Service
+Resized / transcoded snapshot variants kept in a byte-budgeted LRU
+"""
+
+import hashlib
+import os
+from io import BytesIO
+from PIL import Image
+from app.utils.cache import ByteLRUCache
+
+FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'jpg': ('JPEG', 'image/jpeg'),
+    'webp': ('WEBP', 'image/webp'),
+    'png': ('PNG', 'image/png'),
+}
+
+MAX_DIMENSION = 3840
+
+def check_params(width=None, height=None, fmt='jpeg', quality=75):
+    """Get an error message for invalid variant parameters, or None"""
+    if fmt and fmt.lower() not in FORMATS:
+        return f'Unsupported format: {fmt}'
+    if width is not None and width <= 0:
+        return f'Invalid width: {width}'
+    if height is not None and height <= 0:
+        return f'Invalid height: {height}'
+    if quality is not None and not 1 <= quality <= 100:
+        return f'Invalid quality: {quality} (1-100)'
+    return None
+
+class SnapshotVariants:
+    def __init__(self):
+        self._cache = ByteLRUCache(int(os.getenv('SNAPSHOT_VARIANT_CACHE_MAX_BYTES', 16 * 1024 * 1024)))
+
+    def get_variant(self, camera_id, snapshot, width=None, height=None, fmt='jpeg', quality=75):
+        """Get a resized/transcoded copy of a snapshot result
+
+        Variants are keyed by camera and the upstream snapshot ETag, so a new
+        frame from the camera produces new variants and old ones age out.
+        """
+        error = check_params(width, height, fmt, quality)
+        if error:
+            raise ValueError(error)
+
+        fmt = fmt.lower()
+
+        width = min(width, MAX_DIMENSION) if width else None
+        height = min(height, MAX_DIMENSION) if height else None
+        quality = min(max(quality, 10), 95)
+        key = (camera_id, snapshot['etag'], width, height, fmt, quality)
+
+        variant = self._cache.get(key)
+        if variant is not None:
+            return variant
+
+        content = self._render(snapshot['content'], width, height, FORMATS[fmt][0], quality)
+        variant = {
+            'success': True,
+            'content': content,
+            'content_type': FORMATS[fmt][1],
+            'etag': hashlib.sha1(content).hexdigest(),
+            'timestamp': snapshot['timestamp']
+        }
+
+        # Variants of older frames from this camera are no longer useful
+        self._cache.discard_where(lambda k: k[0] == camera_id and k[1] != snapshot['etag'])
+        self._cache.put(key, variant, len(content))
+        return variant
+
+    def get_stats(self):
+        """Get variant cache counters"""
+        return self._cache.get_stats()
+
+    def _render(self, content, width, height, pil_format, quality):
+        image = Image.open(BytesIO(content))
+
+        if width or height:
+            size = (width or MAX_DIMENSION, height or MAX_DIMENSION)
+            # Let the JPEG decoder downscale in the DCT domain first
+            image.draft('RGB', size)
+            image.thumbnail(size, Image.LANCZOS)
+
+        if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        output = BytesIO()
+        options = {'quality': quality} if pil_format in ('JPEG', 'WEBP') else {'optimize': True}
+        image.save(output, pil_format, **options)
+        return output.getvalue()
+
+# Global snapshot variants instance
+snapshot_variants = SnapshotVariants()
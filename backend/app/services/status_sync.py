@@ -0,0 +1,82 @@
+"""
+Status Sync Service
+In-memory change log of cameras and gates for delta status polling
+
+Every camera or gate change gets a new version. A client passes the last
+version it saw and receives only the devices changed since, plus
+tombstones for the ones deleted. Versions start at the boot time in ms, so
+a version from before a restart (or older than the log) gets a full list.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.camera import Camera
+from app.models.gate import Gate
+
+KINDS = {Camera: 'camera', Gate: 'gate'}
+
+class StatusSync:
+    def __init__(self):
+        self.max_changes = int(os.getenv('STATUS_SYNC_LOG_SIZE', 10000))
+        self.version = int(time.time() * 1000)
+        self._horizon = self.version    # changes at or below this are forgotten
+        self._changes = OrderedDict()   # (kind, id) -> version, oldest first
+        self._lock = threading.Lock()
+
+    def init_app(self):
+        """Record camera and gate rows changed through the ORM on commit"""
+        if not event.contains(Session, 'after_flush', self._after_flush):
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def record(self, kind, ids):
+        """Mark devices as changed; call after their change is visible"""
+        with self._lock:
+            for device_id in ids:
+                self.version += 1
+                key = (kind, device_id)
+                self._changes.pop(key, None)
+                self._changes[key] = self.version
+
+            while len(self._changes) > self.max_changes:
+                _, version = self._changes.popitem(last=False)
+                self._horizon = version
+
+    def changes_since(self, since):
+        """Get (version, {kind: [ids]}) changed after since
+
+        The ids are None when since is unknown, older than the log or from
+        before a restart; the client then needs the full list.
+        """
+        with self._lock:
+            if since is None or since < self._horizon or since > self.version:
+                return self.version, None
+
+            changed = {'camera': [], 'gate': []}
+            for (kind, device_id), version in reversed(self._changes.items()):
+                if version <= since:
+                    break
+                changed[kind].append(device_id)
+            return self.version, changed
+
+    def _after_flush(self, session, flush_context):
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            kind = KINDS.get(type(obj))
+            if kind and (obj in session.new or obj in session.deleted or session.is_modified(obj)):
+                session.info.setdefault('status_changes', set()).add((kind, obj.id))
+
+    def _after_commit(self, session):
+        changes = session.info.pop('status_changes', None)
+        for kind, device_id in changes or ():
+            self.record(kind, [device_id])
+
+    def _after_rollback(self, session):
+        session.info.pop('status_changes', None)
+
+# Global status sync instance
+status_sync = StatusSync()
@@ -0,0 +1,77 @@
+"""
+Cache Utilities
+Thread-safe LRU cache bounded by total byte size
+"""
+
+import threading
+from collections import OrderedDict
+
+class ByteLRUCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Get a value and mark it most recently used, or None"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, size):
+        """Store a value, evicting least recently used entries to fit"""
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+            self._items[key] = (value, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+        return True
+
+    def pop(self, key):
+        """Remove a value if present"""
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is None:
+                return None
+
+            self.current_bytes -= item[1]
+            return item[0]
+
+    def discard_where(self, predicate):
+        """Remove every entry whose key matches predicate"""
+        with self._lock:
+            for key in [k for k in self._items if predicate(k)]:
+                _, size = self._items.pop(key)
+                self.current_bytes -= size
+
+    def get_stats(self):
+        """Get cache usage counters"""
+        return {
+            'entries': len(self._items),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
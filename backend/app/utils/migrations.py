@@ -0,0 +1,42 @@
+"""
+Schema Migrations
+Bring existing tables up to date with the models; db.create_all() only
+creates missing tables
+"""
+
+from sqlalchemy import inspect, text
+
+def upgrade_schema(db):
+    """Add missing nullable columns and missing indexes; returns what changed"""
+    engine = db.engine
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    changes = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                print(f"⚠️  Cannot add NOT NULL column {table.name}.{column.name} automatically")
+                continue
+
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as connection:
+                connection.execute(text(
+                    f'ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}'
+                ))
+            changes.append(f'column {table.name}.{column.name}')
+
+        existing_indexes = {index['name'] for index in inspect(engine).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            index.create(bind=engine, checkfirst=True)
+            changes.append(f'index {index.name}')
+
+    return changes
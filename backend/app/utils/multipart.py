@@ -0,0 +1,91 @@
+"""
+Multipart Utilities
+Incremental parser for long-lived multipart streams (ISAPI alertStream)
+"""
+
+import re
+
+_BOUNDARY_PARAM = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+
+def get_boundary(content_type, default='boundary'):
+    """Extract the boundary parameter from a multipart Content-Type"""
+    match = _BOUNDARY_PARAM.search(content_type or '')
+    boundary = match.group(1).strip() if match else default
+    # Some firmwares include the leading dashes in the parameter itself
+    return boundary[2:] if boundary.startswith('--') else boundary
+
+class MultipartStreamParser:
+    """Feed raw chunks in, get complete (headers, body) parts out"""
+
+    def __init__(self, boundary, max_part_size=8 * 1024 * 1024):
+        self.delimiter = b'--' + boundary.encode('latin-1')
+        self.max_part_size = max_part_size
+        self._buffer = bytearray()
+        self._state = 'boundary'
+        self._headers = None
+        self._length = None
+
+    def feed(self, chunk):
+        """Add bytes and return the list of parts completed by them"""
+        self._buffer.extend(chunk)
+        parts = []
+
+        while True:
+            if self._state == 'boundary':
+                index = self._buffer.find(self.delimiter)
+                if index < 0:
+                    # Keep a tail in case the delimiter is split across chunks
+                    del self._buffer[:max(len(self._buffer) - len(self.delimiter), 0)]
+                    break
+                del self._buffer[:index + len(self.delimiter)]
+                self._state = 'headers'
+
+            elif self._state == 'headers':
+                end = self._buffer.find(b'\r\n\r\n')
+                if end < 0:
+                    if len(self._buffer) > 16 * 1024:
+                        self._reset()
+                    break
+                self._headers = self._parse_headers(bytes(self._buffer[:end]))
+                del self._buffer[:end + 4]
+                length = self._headers.get('content-length', '')
+                self._length = int(length) if length.isdigit() else None
+                self._state = 'body'
+
+            elif self._state == 'body':
+                if self._length is not None:
+                    if len(self._buffer) < self._length:
+                        break
+                    body = bytes(self._buffer[:self._length])
+                    del self._buffer[:self._length]
+                else:
+                    index = self._buffer.find(b'\r\n' + self.delimiter)
+                    if index < 0:
+                        if len(self._buffer) > self.max_part_size:
+                            self._reset()
+                        break
+                    body = bytes(self._buffer[:index])
+                    del self._buffer[:index + 2]
+
+                parts.append((self._headers, body))
+                self._headers = None
+                self._length = None
+                self._state = 'boundary'
+
+        return parts
+
+    def _parse_headers(self, raw):
+        headers = {}
+        # Drop the rest of the delimiter line (CRLF or the closing "--")
+        for line in raw.decode('latin-1').split('\r\n'):
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        return headers
+
+    def _reset(self):
+        """Resynchronise on the next delimiter after a malformed part"""
+        self._buffer.clear()
+        self._state = 'boundary'
+        self._headers = None
+        self._length = None
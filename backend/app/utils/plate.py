@@ -0,0 +1,16 @@
+"""
+License Plate Utilities
+Normalize plate strings from registration forms and ANPR reads
+"""
+
+import re
+
+# Separators that ANPR reads and manual entry disagree on
+_SEPARATORS = re.compile(r'[\s\-\.·]+')
+
+def normalize_plate(license_plate):
+    """Normalize a license plate for lookups (uppercase, no separators)"""
+    if not license_plate:
+        return ''
+
+    return _SEPARATORS.sub('', str(license_plate)).upper()
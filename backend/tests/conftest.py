@@ -0,0 +1,38 @@
+"""
+Test fixtures: the Flask app on a temporary SQLite database
+"""
+
+import os
+import tempfile
+
+# Services read their settings at import time, so configure before importing the app
+_workdir = tempfile.mkdtemp(prefix='smart-village-tests-')
+os.environ.update({
+    'DATABASE_URI': f"sqlite:///{os.path.join(_workdir, 'test.db')}",
+    'ACCESS_JOURNAL_DIR': os.path.join(_workdir, 'journal'),
+    'ANPR_IMAGE_DIR': os.path.join(_workdir, 'anpr'),
+    'HEARTBEAT_ENABLED': 'False',
+    'ANPR_LISTENER_ENABLED': 'False',
+    'RESPONSE_CACHE_ENABLED': 'False'
+})
+
+import pytest
+from app import create_app, db as _db
+
+@pytest.fixture(scope='session')
+def app():
+    return create_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def db(app):
+    """The database session inside an app context; tables are emptied afterwards"""
+    with app.app_context():
+        yield _db
+        _db.session.rollback()
+        for table in reversed(_db.metadata.sorted_tables):
+            _db.session.execute(table.delete())
+        _db.session.commit()
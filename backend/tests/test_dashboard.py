@@ -0,0 +1,99 @@
+"""
+Dashboard overview: same response as the per-count queries it replaced,
+in at most one query per table
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.models.access_log import AccessLog
+from app.models.camera import Camera
+from app.models.gate import Gate
+from app.models.vehicle import Vehicle
+
+@contextmanager
+def count_queries(engine):
+    """Count statements this thread sends to the database"""
+    thread = threading.get_ident()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def seed(db):
+    now = datetime.utcnow()
+    db.session.add_all([
+        Vehicle(license_plate='ABC1234', owner_name='A', is_permanent=True, status='active'),
+        Vehicle(license_plate='ABC1235', owner_name='B', is_permanent=False, status='active'),
+        Vehicle(license_plate='ABC1236', owner_name='C', is_permanent=True, status='inactive'),
+        Camera(name='North', ip_address='10.0.0.1', status='online'),
+        Camera(name='South', ip_address='10.0.0.2', status='offline'),
+        Camera(name='East', ip_address='10.0.0.3', status='error'),
+        Gate(name='Main', location='North', is_online=True, status='open'),
+        Gate(name='Side', location='South', is_online=False, status='closed'),
+        Gate(name='Back', location='East', is_online=None, status='closed')
+    ])
+    for hours_ago, event_type, method in [
+        (1, 'entry', 'anpr'), (2, 'entry', 'anpr'), (3, 'exit', 'anpr'),
+        (4, 'denied', 'anpr'), (5, 'entry', 'manual'), (30, 'entry', 'anpr'),
+        (30, 'exit', 'manual')
+    ]:
+        db.session.add(AccessLog(
+            license_plate='ABC1234', event_type=event_type, access_method=method,
+            timestamp=now - timedelta(hours=hours_ago)
+        ))
+    db.session.commit()
+
+def expected_overview():
+    """The overview as the original one-count-per-query route built it"""
+    yesterday = datetime.utcnow() - timedelta(hours=24)
+    recent = AccessLog.query.filter(AccessLog.timestamp >= yesterday)
+    return {
+        'vehicles': {
+            'total': Vehicle.query.count(),
+            'permanent': Vehicle.query.filter_by(is_permanent=True).count(),
+            'temporary': Vehicle.query.filter_by(is_permanent=False).count(),
+            'active': Vehicle.query.filter_by(status='active').count()
+        },
+        'cameras': {
+            'total': Camera.query.count(),
+            'online': Camera.query.filter_by(status='online').count(),
+            'offline': Camera.query.filter_by(status='offline').count()
+        },
+        'gates': {
+            'total': Gate.query.count(),
+            'online': Gate.query.filter_by(is_online=True).count(),
+            'open': Gate.query.filter_by(status='open').count()
+        },
+        'access_logs_24h': {
+            'entries': recent.filter(AccessLog.event_type == 'entry').count(),
+            'exits': recent.filter(AccessLog.event_type == 'exit').count(),
+            'manual_overrides': recent.filter(AccessLog.access_method == 'manual').count()
+        }
+    }
+
+def test_overview_matches_original_response(client, db):
+    seed(db)
+
+    response = client.get('/api/dashboard/overview')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'overview': expected_overview()}
+
+def test_overview_uses_one_query_per_table(client, db):
+    seed(db)
+    client.get('/api/health')   # start background workers outside the count
+
+    with count_queries(db.engine) as statements:
+        response = client.get('/api/dashboard/overview')
+
+    assert response.status_code == 200
+    assert len(statements) <= 4, statements
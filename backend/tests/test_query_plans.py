@@ -0,0 +1,13 @@
+"""
+Dashboard queries on access_logs must be served by an index
+"""
+
+import pytest
+from app.cli import dashboard_query_shapes, explain, is_full_scan
+
+@pytest.mark.parametrize('name', list(dashboard_query_shapes()))
+def test_dashboard_query_uses_index(app, name):
+    with app.app_context():
+        plan = explain(dashboard_query_shapes()[name])
+
+    assert not is_full_scan(plan), f'{name} scans access_logs: {plan}'
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Smart Village HIK Connect - Fake Hikvision Camera
+Local stand-in for a camera's ISAPI snapshot and ANPR alertStream endpoints
+
+Usage:
+    python tools/fake_camera.py --port 8081 --interval 3 กข1234 ABC123
+
+Register a camera with ip_address 127.0.0.1 and port 8081 to try the
+snapshot endpoints and the ANPR listener without hardware.
+"""
+
+import argparse
+import itertools
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+BOUNDARY = 'boundary'
+
+def make_jpeg(text):
+    """Render a small JPEG (Pillow) or fall back to a fixed byte string"""
+    try:
+        from PIL import Image, ImageDraw
+        image = Image.new('RGB', (640, 360), (40, 40, 40))
+        ImageDraw.Draw(image).text((20, 20), text, fill=(255, 255, 255))
+        output = BytesIO()
+        image.save(output, 'JPEG')
+        return output.getvalue()
+    except ImportError:
+        return b'\xff\xd8\xff\xe0' + text.encode('utf-8') + b'\xff\xd9'
+
+def anpr_alert(plate, confidence, direction):
+    now = datetime.now(timezone.utc).astimezone().isoformat(timespec='seconds')
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<EventNotificationAlert version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">
+<ipAddress>127.0.0.1</ipAddress>
+<channelID>1</channelID>
+<dateTime>{now}</dateTime>
+<eventType>ANPR</eventType>
+<eventState>active</eventState>
+<eventDescription>ANPR</eventDescription>
+<ANPR>
+<licensePlate>{plate}</licensePlate>
+<confidenceLevel>{confidence}</confidenceLevel>
+<direction>{direction}</direction>
+</ANPR>
+<picNum>1</picNum>
+</EventNotificationAlert>""".encode('utf-8')
+
+def heartbeat_alert():
+    now = datetime.now(timezone.utc).astimezone().isoformat(timespec='seconds')
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<EventNotificationAlert version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">
+<dateTime>{now}</dateTime>
+<eventType>videoloss</eventType>
+<eventState>inactive</eventState>
+</EventNotificationAlert>""".encode('utf-8')
+
+def part(content_type, body):
+    return (
+        f'--{BOUNDARY}\r\nContent-Type: {content_type}\r\n'
+        f'Content-Length: {len(body)}\r\n\r\n'
+    ).encode('latin-1') + body + b'\r\n'
+
+class FakeCameraHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    plates = ['TEST1234']
+    interval = 3.0
+
+    def do_GET(self):
+        if self.path.startswith('/ISAPI/Streaming/channels/1/picture'):
+            body = make_jpeg(datetime.now().isoformat())
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path.startswith('/ISAPI/Event/notification/alertStream'):
+            self.send_response(200)
+            self.send_header('Content-Type', f'multipart/mixed; boundary={BOUNDARY}')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self._stream_alerts()
+        else:
+            self.send_error(404)
+
+    def _stream_alerts(self):
+        directions = itertools.cycle(['forward', 'reverse'])
+        try:
+            for plate in itertools.cycle(self.plates):
+                self.wfile.write(part('application/xml; charset="UTF-8"', heartbeat_alert()))
+                self.wfile.write(part('application/xml; charset="UTF-8"', anpr_alert(plate, 95, next(directions))))
+                self.wfile.write(part('image/jpeg', make_jpeg(plate)))
+                self.wfile.flush()
+                time.sleep(self.interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        print(f"📷 {self.address_string()} {format % args}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake Hikvision camera')
+    parser.add_argument('plates', nargs='*', default=['TEST1234'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--interval', type=float, default=3.0)
+    args = parser.parse_args()
+
+    FakeCameraHandler.plates = args.plates
+    FakeCameraHandler.interval = args.interval
+
+    print(f"📷 Fake camera on http://{args.host}:{args.port} sending {', '.join(args.plates)}")
+    ThreadingHTTPServer((args.host, args.port), FakeCameraHandler).serve_forever()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Smart Village HIK Connect - Fake Gate Controller
+Local stand-in for a TCP gate controller or network relay board
+
+Usage:
+    python tools/fake_gate_controller.py --port 9100 --delay 0.05
+
+Register a gate with controller_ip 127.0.0.1, controller_port 9100 and
+control_method tcp (OPEN / CLOSE / STATUS) or relay (PULSE 1 opens,
+PULSE 2 closes) to try the gate drivers without hardware. Each frame is
+answered after --delay seconds on its own thread, so pipelined frames can
+be answered out of order just like on a busy controller.
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+class FakeGateHandler(socketserver.StreamRequestHandler):
+    delay = 0.05
+    idle_timeout = None
+    state = 'closed'
+    frames = 0
+
+    def handle(self):
+        self.request.settimeout(self.idle_timeout)
+        write_lock = threading.Lock()
+
+        while True:
+            try:
+                line = self.rfile.readline()
+            except OSError:
+                break   # idle timeout: drop the connection like real controllers do
+            if not line:
+                break
+
+            threading.Thread(
+                target=self._answer, args=(line.decode('utf-8').strip(), write_lock), daemon=True
+            ).start()
+
+    def _answer(self, line, write_lock):
+        frame_id, _, command = line.partition(' ')
+        time.sleep(self.delay)
+        reply = self._execute(command.split())
+        FakeGateHandler.frames += 1
+
+        with write_lock:
+            try:
+                self.wfile.write(f'{frame_id} {reply}\n'.encode('utf-8'))
+                self.wfile.flush()
+            except OSError:
+                pass
+
+    def _execute(self, words):
+        verb = words[0].upper() if words else ''
+        if verb == 'PULSE' and len(words) > 1:
+            verb = {'1': 'OPEN', '2': 'CLOSE'}.get(words[1], '')
+        if verb == 'OPEN':
+            FakeGateHandler.state = 'open'
+        elif verb == 'CLOSE':
+            FakeGateHandler.state = 'closed'
+        elif verb != 'STATUS':
+            return f"ERR unknown command {' '.join(words)}"
+        return f'OK {FakeGateHandler.state}'
+
+class FakeGateController(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve(host='127.0.0.1', port=9100, delay=0.05, idle_timeout=None):
+    """Start a controller on a background thread and return the server"""
+    FakeGateHandler.delay = delay
+    FakeGateHandler.idle_timeout = idle_timeout
+    server = FakeGateController((host, port), FakeGateHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake TCP gate controller / relay board')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--delay', type=float, default=0.05, help='seconds before each reply')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='drop connections idle for this many seconds')
+    args = parser.parse_args()
+
+    FakeGateHandler.delay = args.delay
+    FakeGateHandler.idle_timeout = args.idle_timeout
+
+    print(f"🚧 Fake gate controller on tcp://{args.host}:{args.port} (reply delay {args.delay}s)")
+    FakeGateController((args.host, args.port), FakeGateHandler).serve_forever()
@@ -3,6 +3,7 @@ import { Button } from '@/components/ui/button.jsx'
 import { Card, CardContent, CardDescription, CardFooter, CardHeader, CardTitle } from '@/components/ui/card.jsx'
 import { Input } from '@/components/ui/input.jsx'
 import { Label } from '@/components/ui/label.jsx'
+import { useEventStream } from '@/hooks/use-event-stream.js'
 import { Separator } from '@/components/ui/separator.jsx'
 import { CameraIcon, PlusCircleIcon, RefreshCcwIcon, EyeIcon } from 'lucide-react'
 import { Badge } from '@/components/ui/badge.jsx'
@@ -130,6 +131,17 @@ const CameraMonitor = () => {
     fetchCameras();
   }, []);
 
+  // Apply live camera status changes pushed by the backend
+  useEventStream(['camera'], (topic, data) => {
+    if (topic === 'resync') {
+      fetchCameras();
+      return;
+    }
+    setCameras(prev => prev.map(camera =>
+      camera.id === data.camera_id ? { ...camera, status: data.status } : camera
+    ));
+  });
+
   // Get snapshot when a camera is selected
   useEffect(() => {
     if (selectedCamera) {
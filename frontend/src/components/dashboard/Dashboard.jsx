@@ -3,6 +3,7 @@ import { Button } from '@/components/ui/button.jsx'
 import { Card, CardContent, CardDescription, CardFooter, CardHeader, CardTitle } from '@/components/ui/card.jsx'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs.jsx'
 import { RefreshCcwIcon, CarIcon, CameraIcon, AlertCircleIcon, CheckCircleIcon } from 'lucide-react'
+import { useEventStream } from '@/hooks/use-event-stream.js'
 // Custom GateIcon
 const GateIcon = (props) => (
   <svg
@@ -62,6 +63,21 @@ const Dashboard = () => {
     fetchDashboardData();
   }, []);
 
+  // Apply live gate and camera changes pushed by the backend
+  useEventStream(['gate', 'camera'], (topic, data) => {
+    if (topic === 'resync') {
+      fetchDashboardData();
+    } else if (topic === 'gate') {
+      const { gate_id, name, ...changes } = data;
+      setGates(prev => prev.map(gate => gate.id === gate_id ? { ...gate, ...changes } : gate));
+    } else {
+      setCameras(prev => prev.map(camera =>
+        camera.id === data.camera_id ? { ...camera, status: data.status } : camera
+      ));
+    }
+    setLastRefresh(new Date());
+  });
+
   // Calculate statistics
   const stats = {
     totalCameras: cameras.length,
@@ -25,6 +25,7 @@ const GateIcon = (props) => (
 import { Badge } from '@/components/ui/badge.jsx'
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select.jsx'
 import { Textarea } from '@/components/ui/textarea.jsx'
+import { useEventStream } from '@/hooks/use-event-stream.js'
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
 
@@ -81,6 +82,23 @@ const GateControl = () => {
     }
   };
 
+  // Poll a queued gate command until the controller has answered
+  const waitForCommand = async (commandId) => {
+    for (let attempt = 0; attempt < 60; attempt++) {
+      const response = await fetch(`${API_URL}/gate/commands/${commandId}`);
+      const data = await response.json();
+      
+      if (!data.success) {
+        return data;
+      }
+      if (data.command.status === 'succeeded' || data.command.status === 'failed') {
+        return { success: data.command.status === 'succeeded', error: data.command.error };
+      }
+      await new Promise(resolve => setTimeout(resolve, 250));
+    }
+    return { success: false, error: 'Timed out waiting for the gate controller' };
+  };
+
   // Open gate
   const openGate = async (gateId) => {
     if (!operatorName) {
@@ -101,7 +119,10 @@ const GateControl = () => {
         }),
       });
       
-      const data = await response.json();
+      let data = await response.json();
+      if (data.success && data.command_id) {
+        data = await waitForCommand(data.command_id);
+      }
       
       if (data.success) {
         alert('เปิดไม้กั้นสำเร็จ');
@@ -135,7 +156,10 @@ const GateControl = () => {
         }),
       });
       
-      const data = await response.json();
+      let data = await response.json();
+      if (data.success && data.command_id) {
+        data = await waitForCommand(data.command_id);
+      }
       
       if (data.success) {
         alert('ปิดไม้กั้นสำเร็จ');
@@ -206,6 +230,18 @@ const GateControl = () => {
     fetchCameras();
   }, []);
 
+  // Apply live gate changes pushed by the backend
+  useEventStream(['gate'], (topic, data) => {
+    if (topic === 'resync') {
+      fetchGates();
+      return;
+    }
+    const { gate_id, name, ...changes } = data;
+    const patch = gate => gate.id === gate_id ? { ...gate, ...changes } : gate;
+    setGates(prev => prev.map(patch));
+    setSelectedGate(prev => prev && patch(prev));
+  });
+
   return (
     <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
       {/* Gate List */}
@@ -0,0 +1,27 @@
+import { useEffect, useRef } from 'react'
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
+
+// Subscribe to the backend's live event stream.
+// onEvent(topic, data) runs for every event; topic 'resync' means events
+// were missed and the component should reload its full state.
+// EventSource reconnects by itself and resumes with Last-Event-ID.
+export function useEventStream(topics, onEvent) {
+  const handler = useRef(onEvent);
+  handler.current = onEvent;
+  const topicList = topics.join(',');
+
+  useEffect(() => {
+    const source = new EventSource(`${API_URL}/events/stream?topics=${topicList}`);
+    const listeners = [...topicList.split(','), 'resync'].map(topic => {
+      const listener = (event) => handler.current(topic, JSON.parse(event.data));
+      source.addEventListener(topic, listener);
+      return [topic, listener];
+    });
+
+    return () => {
+      listeners.forEach(([topic, listener]) => source.removeEventListener(topic, listener));
+      source.close();
+    };
+  }, [topicList]);
+}